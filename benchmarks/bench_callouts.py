@@ -0,0 +1,65 @@
+"""
+callout 변환 stress benchmark (수천 개의 callout이 있는 문서)
+
+    python -m benchmarks.bench_callouts [callout 수]
+
+기존 방식(문서 전체에 re.DOTALL lazy 정규식)과 markdown engine의 stack 기반 callout 변환을 비교
+    - adjacent: 연속된 callout
+    - nested: 중첩된 callout
+    - unclosed: 뒤쪽 절반의 <aside>가 닫히지 않은 문서 (기존 방식은 닫히지 않은 <aside>마다 문서 끝까지 </aside>를 찾음)
+"""
+import re
+import sys
+import time
+import timeit
+
+from src.callouts import set_prompt_type, transform_callout
+
+EMOJIS = ['💡', '📌', '⚠️', '⚡', '🔥', '🚧']
+PARAGRAPH = 'Lorem ipsum dolor sit amet, consectetur adipiscing elit.\n\n- item 1\n- item 2'
+
+
+def legacy_transform_callout(md_text):
+    # 변경 전의 transform_callout (비교용)
+    pattern = re.compile(r"<aside>\s*([\U0001F000-\U0001FFFF])\s*(.*?)\s*</aside>", re.DOTALL)
+
+    def replace_newlines(match):
+        lines = match.group(2).strip().split('\n')
+        return '\n'.join(['> ' + line for line in lines] + [set_prompt_type(match.group(1)), ''])
+
+    return pattern.sub(replace_newlines, md_text)
+
+
+def callout(i: int, body: str = PARAGRAPH) -> str:
+    return f'<aside>\n{EMOJIS[i % len(EMOJIS)]}\n\n{body}\n\n</aside>'
+
+
+def make_documents(n: int):
+    adjacent = '\n'.join(callout(i) for i in range(n))
+    nested = '\n\n'.join(callout(i, f'outer\n\n{callout(i + 1)}\n\nafter') for i in range(n // 2))
+    unclosed = '\n\n'.join(callout(i) if i < n // 2 else f'<aside>\n💡\n\n{PARAGRAPH}' for i in range(n))
+    return {'adjacent': adjacent, 'nested': nested, 'unclosed': unclosed}
+
+
+def bench(func, text: str, repeat: int):
+    """(가장 빠른 실행 시간(ms), 변환 결과), 첫 실행이 1초 이상 걸리면 반복하지 않음"""
+    started_at = time.perf_counter()
+    result = func(text)
+    elapsed = time.perf_counter() - started_at
+    if elapsed < 1:
+        elapsed = min([elapsed] + timeit.repeat(lambda: func(text), number=1, repeat=repeat - 1))
+    return elapsed * 1000, result
+
+
+def main(n: int = 5000, repeat: int = 5):
+    print(f'{n} callouts per document (min of {repeat} runs)')
+    print(f'{"document":<10} {"size":>8} {"legacy":>10} {"engine":>10} {"converted (legacy/engine)":>28}')
+    for name, text in make_documents(n).items():
+        legacy_ms, legacy_result = bench(legacy_transform_callout, text, repeat)
+        engine_ms, engine_result = bench(transform_callout, text, repeat)
+        print(f'{name:<10} {len(text) / 1e6:>6.2f}MB {legacy_ms:>8.1f}ms {engine_ms:>8.1f}ms '
+              f'{legacy_result.count("{: .prompt-"):>14} / {engine_result.count("{: .prompt-")}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
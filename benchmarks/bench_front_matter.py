@@ -0,0 +1,63 @@
+"""
+front matter 출력 micro benchmark (page 수천 개를 다시 발행하는 경우)
+
+    python -m benchmarks.bench_front_matter [page 수]
+
+page마다 실행되는 FrontMatter.to_md를 비교
+    - legacy: 변경 전의 to_md (self.dict() 후 yaml.dump)
+    - cdumper: libyaml의 CDumper로 yaml.dump (참고용, 이모지 등의 출력이 달라서 사용하지 않음)
+    - template: 변경 후의 to_md (src.front_matter_yaml)
+"""
+import random
+import sys
+import timeit
+import warnings
+
+import yaml
+
+from src.models import FrontMatter
+
+TITLE_WORDS = ['[Python]', '파이썬', 'asyncio', '완벽', '가이드:', 'yes', '2024', 'WandB', 'Sweep', '사용방법', "it's",
+               '(pytorch', '하이퍼', '파라미터', '튜닝)', '#1', 'MLOps', '💡']
+TAGS = ['python', 'asyncio', '딥러닝', 'pytorch', 'sweep', 'wandb', 'null', '1.0', 'notion']
+
+
+def make_front_matters(n: int):
+    random.seed(0)
+    return [FrontMatter(title=' '.join(random.choices(TITLE_WORDS, k=random.randint(3, 16))),
+                        categories=['Dev', random.choice(['Python', 'MLOps', 'Blog'])],
+                        tags=random.sample(TAGS, random.randint(1, 5)),
+                        date='2024-09-21 00:00:00 +0900', uid=i, math=i % 3 == 0, mermaid=i % 7 == 0)
+            for i in range(n)]
+
+
+def legacy_to_md(front_matter: FrontMatter, dumper=yaml.Dumper) -> str:
+    # 변경 전의 FrontMatter.to_md (비교용)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)  # pydantic v2의 dict() 경고
+        _dict = front_matter.dict()
+    if not _dict['math']:
+        _dict.pop('math')
+    if not _dict['mermaid']:
+        _dict.pop('mermaid')
+    _yaml = yaml.dump(_dict, Dumper=dumper, default_flow_style=False, allow_unicode=True)
+    return f"---\n{_yaml}---"
+
+
+def main(n: int = 5000, repeat: int = 5):
+    front_matters = make_front_matters(n)
+    funcs = {'legacy': legacy_to_md, 'template': FrontMatter.to_md}
+    if yaml.__with_libyaml__:
+        funcs['cdumper'] = lambda front_matter: legacy_to_md(front_matter, yaml.CDumper)
+
+    expected = [legacy_to_md(front_matter) for front_matter in front_matters]
+    print(f'{n} pages (min of {repeat} runs)')
+    for name, func in funcs.items():
+        ms = min(timeit.repeat(lambda: [func(front_matter) for front_matter in front_matters],
+                               number=1, repeat=repeat)) * 1000
+        same = sum(func(front_matter) == md for front_matter, md in zip(front_matters, expected))
+        print(f'{name:<9} {ms:>8.1f}ms {ms * 1000 / n:>7.1f}us/page  same as legacy: {same}/{n}')
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -1,6 +1,8 @@
+import asyncio
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import List, Tuple
+from typing import AsyncIterable, AsyncIterator, List, Optional, Tuple, Union
 from easydict import EasyDict
 import traceback
 from src.loggers import get_logger
@@ -11,49 +13,257 @@ logger = get_logger(log_file=f'{today}.log', logger_name='notion2md')
 
 from src.alerts.send_gmail import GmailSender
 from src.alerts.send_slack import SlackBot
-from src.upload_github import upload_or_update_file_to_github
-from src.models import PageInfo
-from src.notion_sdk.notion_download import export_notion_data, get_posting_pages
-from src.notion_sdk.update_notion_db import update_notion_db
+from src.http_client import close_http_client, configure_http_client
+from src.concurrency import concurrency_report, configure_concurrency
+from src.downloader import (DEFAULT_CHUNK_SIZE, DEFAULT_PARALLEL, DEFAULT_PARALLEL_MIN_SIZE, DEFAULT_RETRIES,
+                            Downloader)
+from src.export_archive import DirectoryArchive, ZipArchive
+from src.front_matter import FrontMatterMapping
+from src.image_cache import ImageCache
+from src.image_optimizer import (DEFAULT_JPEG_QUALITY, DEFAULT_MAX_DIMENSION, DEFAULT_MAX_OPTIMIZE_SIZE,
+                                 DEFAULT_PNG_COMPRESS_LEVEL, ImageOptimizer)
+from src.upload_github import GitHubBatchPublisher, GitHubTreeCache, upload_or_update_file_to_github
+from src.models import PageInfo, PageJob
+from src.notion_sdk.notion_download import extract_notion_data, stream_posting_pages
+from src.notion_sdk.notion_exporter import (DEFAULT_DOWNLOAD_BUFFER, DEFAULT_EXPORT_DEADLINE, EXPORT_TASK_SERVICE,
+                                            NotionBackUpClient)
+from src.notion_sdk.notion_session import DEFAULT_SESSION_TTL, NotionSessionCache
+from src.notion_sdk.update_notion_db import NotionStatusUpdater
+from src.pipeline import Pipeline, Stage
+from src.rate_limit import configure_rate_limit
 from src.replace_image import replace_image_urls_v2
-from src.transform_markdown import processing_markdown
-from src.utils import delete_file, get_config
+from src.retry import DEFAULT_MAX_RETRIES
+from src.sync_state import SyncState, content_hash
+from src.transform_markdown import convert_markdown_file
+from src.upload_local_repo import LocalRepoPublisher
+from src.utils import delete_file, get_config, get_option, make_workspace
 
 
 def save_md_file(save_fp: Path, content: str) -> None:
     with open(save_fp, 'w') as f:
         f.write(content)
 
-def process_page(config: EasyDict, page: PageInfo) -> bool:
-    try:
-        md_path = export_notion_data(config.NOTION.TOKEN_V2, config.NOTION.DOWNLOAD_DIR, page)
-        logger.info(f'Exported notion data: {md_path}, page: {page.name}')
+class RunContext:
+    """한번의 실행 동안 stage들이 공유하는 설정 및 상태"""
+
+    def __init__(self, config: EasyDict):
+        self.config = config
+
+        # 이전 실행의 발행 정보 (변환 결과가 같은 페이지는 commit 생략)
+        self.sync_state = None
+        if get_option(config, 'SYNC.ENABLED', True):
+            self.sync_state = SyncState(get_option(config, 'SYNC.STATE_PATH', './.notion2md/sync_state.json'))
+        # notion 컬럼 -> front matter 변환 규칙 (모든 페이지에서 사용)
+        self.front_matter_mapping = FrontMatterMapping.from_config(config)
+        # 업로드한 이미지 url (같은 이미지는 다시 업로드하지 않음)
+        self.image_cache = None
+        if get_option(config, 'IMGUR.CACHE_PATH'):
+            self.image_cache = ImageCache(config.IMGUR.CACHE_PATH)
+
+        # 서비스별 요청 속도 제한 (같은 서비스의 모든 요청이 공유, 값이 없으면 기본값 사용)
+        for service, option in (('imgur', 'IMGUR.RATE_LIMIT'), ('notion', 'NOTION.RATE_LIMIT'),
+                                ('notion_export', 'NOTION.EXPORT_RATE_LIMIT'), ('github', 'GITHUB.RATE_LIMIT')):
+            configure_rate_limit(service, get_option(config, f'{option}.RATE'), get_option(config, f'{option}.BURST'))
+        # 서비스별 동시 요청 수 (응답 시간, 429/5xx/timeout에 따라 INITIAL부터 MAX까지 자동 조절)
+        for service, option in (('imgur', 'IMGUR.CONCURRENCY'), (EXPORT_TASK_SERVICE, 'NOTION.EXPORT_CONCURRENCY'),
+                                ('github', 'GITHUB.CONCURRENCY')):
+            configure_concurrency(service, get_option(config, f'{option}.INITIAL'), get_option(config, f'{option}.MAX'))
+
+        # 업로드 전 이미지 최적화 (process pool에서 실행)
+        self.image_optimizer = None
+        if get_option(config, 'IMAGE.OPTIMIZE', True):
+            self.image_optimizer = ImageOptimizer(
+                max_dimension=get_option(config, 'IMAGE.MAX_DIMENSION', DEFAULT_MAX_DIMENSION),
+                jpeg_quality=get_option(config, 'IMAGE.JPEG_QUALITY', DEFAULT_JPEG_QUALITY),
+                png_compress_level=get_option(config, 'IMAGE.PNG_COMPRESS_LEVEL', DEFAULT_PNG_COMPRESS_LEVEL),
+                workers=get_option(config, 'IMAGE.WORKERS'),
+                max_optimize_size=int(get_option(config, 'IMAGE.MAX_OPTIMIZE_MB',
+                                                 DEFAULT_MAX_OPTIMIZE_SIZE // (1024 * 1024)) * 1024 * 1024))
+
+        # 발행할 post를 모아서 실행 마지막에 하나의 commit으로 업로드
+        self.publisher = None
+        self.pending_jobs: List[PageJob] = []  # commit 후 notion 상태를 변경할 페이지
+        if config.GITHUB.AUTO_COMMIT and get_option(config, 'GITHUB.BATCH_COMMIT', True):
+            tree_cache = None
+            if get_option(config, 'GITHUB.TREE_CACHE_PATH'):
+                tree_cache = GitHubTreeCache(config.GITHUB.TREE_CACHE_PATH)
+            self.publisher = GitHubBatchPublisher(config.GITHUB.USERNAME, config.GITHUB.REPO_NAME,
+                                                  config.GITHUB.BRANCH, config.GITHUB.TOKEN, tree_cache=tree_cache)
+        elif (not config.GITHUB.AUTO_COMMIT and config.GITHUB.LOCAL_REPO_POST_DIR
+              and get_option(config, 'GITHUB.LOCAL_COMMIT', False)):
+            # 로컬 저장소에 저장 후 git으로 commit (push는 optional)
+            self.publisher = LocalRepoPublisher(config.GITHUB.LOCAL_REPO_POST_DIR,
+                                                push=get_option(config, 'GITHUB.LOCAL_PUSH', False),
+                                                remote=get_option(config, 'GITHUB.LOCAL_REMOTE'),
+                                                branch=get_option(config, 'GITHUB.LOCAL_BRANCH'))
+
+        # notion 상태 변경은 하나의 client로 page 처리와 별도로 진행 (요청 속도는 notion api 제한에 맞게 조절)
+        self.status_updater = NotionStatusUpdater(config)
+        self.status_updates: List[Tuple[PageJob, asyncio.Task]] = []
+
+        self.skipped_publishes = 0
+
+    def close(self) -> None:
+        for _, task in self.status_updates:
+            task.cancel()
+        if self.image_optimizer is not None:
+            self.image_optimizer.close()
+
+    def report(self) -> str:
+        lines = []
+        if self.sync_state is not None:
+            lines.append(f'sync: {self.skipped_publishes} unchanged posts (publish skipped)')
+        # 서비스별 현재 동시 요청 수
+        concurrency = concurrency_report()
+        if concurrency:
+            lines.append(concurrency)
+        return '\n'.join(lines)
+
+def export_stage(ctx: RunContext, job: PageJob) -> PageJob:
+    # export task 및 zip 다운로드는 export_pages에서 여러 페이지를 한번에 처리함
+    if job.error is not None:
+        raise job.error
+    if get_option(ctx.config, 'NOTION.EXTRACT', True):
+        job.md_path = extract_notion_data(job.workspace, job.page)
+        job.archive = DirectoryArchive(job.md_path)
+    else:
+        # 압축 해제 없이 zip에서 markdown, 이미지를 바로 읽음
+        job.archive = ZipArchive(job.export_fp)
+        job.md_path = job.archive.markdown_name
+    logger.info(f'Exported notion data: {job.archive}, page: {job.page.name}')
+    return job
+
+def transform_stage(ctx: RunContext, job: PageJob) -> PageJob:
+    # 이미 발행한 post는 front matter의 date(시각 포함)를 유지하여 내용이 바뀌지 않았으면 같은 파일이 되도록 함
+    record = ctx.sync_state.get(job.page) if ctx.sync_state is not None else None
+    published_date = record.published_date if record is not None else None
+    # 컬럼 정보(header)까지만 읽어서 front matter를 만들고 본문은 이어서 한번만 읽음
+    with job.archive.open_markdown() as f:
+        job.md = convert_markdown_file(f, ctx.front_matter_mapping, published_date)
+    logger.info(f'Transformed markdown: {job.md.filename}, page: {job.page.name}')
+    return job
+
+async def image_stage(ctx: RunContext, job: PageJob) -> PageJob:
+    config = ctx.config
+    job.md.content = await replace_image_urls_v2(job.md.content, job.archive, config.IMGUR.CLIENT_ID,
+                                                 image_cache=ctx.image_cache,
+                                                 image_optimizer=ctx.image_optimizer,
+                                                 image_paths=job.md.images)
+    # 업로드한 이미지 url은 page마다 한번 저장
+    if ctx.image_cache is not None:
+        await ctx.image_cache.flush()
+    logger.info(f'Processed images (IMGUR), page: {job.page.name}')
 
-        md = processing_markdown(md_path)
-        logger.info(f'Transformed markdown: {md.filename}, page: {page.name}')
+    job.save_fp = Path(config.NOTION.POST_SAVE_DIR) / job.md.filename
+    save_md_file(job.save_fp, job.md.content)
+    logger.info(f'Saved markdown: {job.save_fp}, page: {job.page.name}')
 
-        content = replace_image_urls_v2(md.content, Path(md_path).parent, config.IMGUR.CLIENT_ID)
-        logger.info(f'Processed images (IMGUR), page: {page.name}')
+    # export 파일은 더이상 필요 없으므로 publish 전에 삭제 (디스크 사용량 제한)
+    cleanup_workspace(job)
+    return job
 
-        save_fp = Path(config.NOTION.POST_SAVE_DIR) / md.filename
-        save_md_file(save_fp, content)
-        logger.info(f'Saved markdown: {save_fp}, page: {page.name}')
+async def publish_stage(ctx: RunContext, job: PageJob) -> PageJob:
+    config = ctx.config
+    if ctx.sync_state is not None and ctx.sync_state.is_published(job.page, job.md.filename, job.md.content):
+        ctx.skipped_publishes += 1
+        logger.info(f'Skipped publish (unchanged): {job.md.filename}, page: {job.page.name}')
+    elif ctx.publisher is not None:
+        # notion 상태는 commit이 완료된 후 변경 (publish_pending)
+        ctx.publisher.add(job.md.filename, job.md.content)
+        ctx.pending_jobs.append(job)
+        logger.info(f'Queued for batch commit: {job.md.filename}, page: {job.page.name}')
+        return job
+    elif config.GITHUB.AUTO_COMMIT:
+        await upload_or_update_file_to_github(config.GITHUB.USERNAME, config.GITHUB.REPO_NAME,
+                                              config.GITHUB.BRANCH, config.GITHUB.TOKEN, job.save_fp)
+        logger.info(f'Auto commit & push done, page: {job.page.name}')
+    else:
+        move_to_local_repo(config, job.save_fp, job.md.filename, job.page.name)
+
+    schedule_mark_posted(ctx, job)
+    return job
+
+def schedule_mark_posted(ctx: RunContext, job: PageJob) -> None:
+    """notion 상태 변경을 기다리지 않고 다음 page 처리 (결과는 finish_status_updates에서 확인)"""
+    ctx.status_updates.append((job, asyncio.create_task(mark_posted(ctx, job))))
+
+async def finish_status_updates(ctx: RunContext, on_error) -> None:
+    """예약된 notion 상태 변경이 모두 끝날 때까지 대기 (실패한 page는 실패 처리)"""
+    updates, ctx.status_updates = ctx.status_updates, []
+    for job, task in updates:
+        try:
+            await task
+        except Exception as e:
+            on_error(job, e, 'notion')
 
-        if config.GITHUB.AUTO_COMMIT:
-            upload_or_update_file_to_github(config.GITHUB.USERNAME, config.GITHUB.REPO_NAME,
-                                            config.GITHUB.BRANCH, config.GITHUB.TOKEN, save_fp)
-            logger.info(f'Auto commit & push done, page: {page.name}')
-        else:
-            move_to_local_repo(config, save_fp, md.filename, page.name)
+async def mark_posted(ctx: RunContext, job: PageJob) -> None:
+    """notion page 상태를 발행 완료로 변경하고 발행 정보 저장"""
+    await ctx.status_updater.update(job.page)
+    logger.info(f'Updated Notion DB, page: {job.page.name}')
+
+    if ctx.sync_state is not None and job.md is not None:
+        ctx.sync_state.update(job.page, content_hash=content_hash(job.md.content), published_path=job.md.filename,
+                              published_date=job.md.date)
+    logger.info(f'Processed {job.page.name}')
+
+async def publish_pending(ctx: RunContext, on_error) -> None:
+    """모아둔 post를 하나의 commit으로 업로드한 뒤 notion 상태 변경 (commit 실패시 모든 페이지 실패 처리)"""
+    if ctx.publisher is None or not ctx.pending_jobs:
+        return
+    jobs, ctx.pending_jobs = ctx.pending_jobs, []
 
-        return True
+    try:
+        await ctx.publisher.flush()
     except Exception as e:
-        logger.error(f'Error processing {page.name}: {str(e)}')
-        logger.error(traceback.format_exc())
-        return False
-    finally:
-        delete_file(md_path)
-        logger.info(f'Deleted exported markdown: {md_path}')
+        for job in jobs:
+            on_error(job, e, 'commit')
+        return
+    logger.info(f'Commit done, {len(jobs)} pages')
+
+    for job in jobs:
+        # commit된 post는 POST_SAVE_DIR에 남기지 않음 (commit 실패시에는 남겨서 직접 확인할 수 있도록 함)
+        remove_saved_post(job)
+        schedule_mark_posted(ctx, job)
+
+def remove_saved_post(job: PageJob) -> None:
+    if job.save_fp is None:
+        return
+    try:
+        job.save_fp.unlink(missing_ok=True)
+        logger.info(f'Deleted saved markdown: {job.save_fp}, page: {job.page.name}')
+    except OSError as e:
+        logger.warning(f'Failed to delete saved markdown: {job.save_fp} ({e})')
+    job.save_fp = None
+
+def cleanup_workspace(job: PageJob) -> None:
+    if job.archive is not None:
+        job.archive.close()
+        job.archive = None
+    # archive를 열기 전에 실패한 메모리 buffer
+    if job.export_fp is not None and not isinstance(job.export_fp, Path):
+        job.export_fp.close()
+    job.export_fp = None
+    if job.workspace is not None:
+        delete_file(job.workspace)
+        logger.info(f'Deleted workspace: {job.workspace}, page: {job.page.name}')
+        job.workspace = None
+
+def build_pipeline(ctx: RunContext, on_error) -> Pipeline:
+    """
+    export -> transform -> image -> publish stage로 구성된 pipeline 생성
+    stage별 worker 수는 PIPELINE.STAGES.<STAGE>, 지정하지 않으면 PIPELINE.WORKERS 사용
+    """
+    config = ctx.config
+    default_workers = get_option(config, 'PIPELINE.WORKERS', 1)
+    queue_size = get_option(config, 'PIPELINE.QUEUE_SIZE', 1)
+
+    stages = []
+    for name, func in [('export', export_stage), ('transform', transform_stage),
+                       ('image', image_stage), ('publish', publish_stage)]:
+        workers = get_option(config, f'PIPELINE.STAGES.{name.upper()}', default_workers)
+        stages.append(Stage(name, partial(func, ctx), workers=workers, queue_size=queue_size))
+
+    return Pipeline(stages, on_error=on_error)
 
 def move_to_local_repo(config: EasyDict, save_fp: Path, filename: str, page_name: str) -> None:
     if config.GITHUB.LOCAL_REPO_POST_DIR is None:
@@ -71,20 +281,111 @@ def move_to_local_repo(config: EasyDict, save_fp: Path, filename: str, page_name
         logger.error(f'Local repo post directory not found: {new_save_dir}')
         logger.error(f'Files saved in: {config.NOTION.POST_SAVE_DIR}')
 
-def process_pages(config: EasyDict, pages: List[PageInfo]) -> Tuple[List[PageInfo], List[PageInfo]]:
-    succeed_pages, failed_pages = [], []
-    for i, page in enumerate(pages, start=1):
-        logger.info(f'Processing [{i}] {page.name}')
-        if process_page(config, page):
-            update_notion_db(config, page)
-            logger.info(f'Updated Notion DB, page: {page.name}')
-            succeed_pages.append(page)
-        else:
-            failed_pages.append(page)
-        logger.info(f'Processed {page.name}')
-    return succeed_pages, failed_pages
-
-def generate_result_message(config: EasyDict, pages: List[PageInfo], succeed_pages: List[PageInfo], failed_pages: List[PageInfo]) -> str:
+async def export_pages(ctx: RunContext, pages: AsyncIterable[PageInfo], jobs: List[PageJob],
+                       on_error) -> AsyncIterator[PageJob]:
+    """
+    조회되는 페이지마다 바로 export task를 등록하고, zip 다운로드가 완료된 순서대로 pipeline에 전달
+    (처리한 페이지는 jobs에 추가됨)
+    """
+    config = ctx.config
+    jobs_by_id = {}
+
+    async def _download_dirs():
+        async for page in pages:
+            job = PageJob(index=len(jobs) + 1, page=page)
+            jobs.append(job)
+            jobs_by_id[page.id] = job
+            logger.info(f'Processing [{job.index}] {page.name}')
+
+            try:
+                job.workspace = make_workspace(config.NOTION.DOWNLOAD_DIR, page.id)
+            except Exception as e:
+                on_error(job, e, None)
+                continue
+            yield page.id, job.workspace
+
+    downloader = Downloader(
+        chunk_size=get_option(config, 'DOWNLOAD.CHUNK_SIZE_KB', DEFAULT_CHUNK_SIZE // 1024) * 1024,
+        retries=get_option(config, 'DOWNLOAD.RETRIES', DEFAULT_RETRIES),
+        parallel=get_option(config, 'DOWNLOAD.PARALLEL', DEFAULT_PARALLEL),
+        parallel_min_size=get_option(config, 'DOWNLOAD.PARALLEL_MIN_MB',
+                                     DEFAULT_PARALLEL_MIN_SIZE // (1024 * 1024)) * 1024 * 1024,
+        progress=get_option(config, 'DOWNLOAD.PROGRESS', False))
+    # space id, file token 조회 결과를 저장하여 다음 실행에서 재사용
+    session_cache = None
+    if get_option(config, 'NOTION.SESSION_CACHE_PATH'):
+        session_cache = NotionSessionCache(config.NOTION.SESSION_CACHE_PATH,
+                                           ttl=get_option(config, 'NOTION.SESSION_TTL', DEFAULT_SESSION_TTL))
+    try:
+        exporter = await asyncio.to_thread(NotionBackUpClient, config.NOTION.TOKEN_V2,
+                                           download_path=config.NOTION.DOWNLOAD_DIR,
+                                           downloader=downloader,
+                                           verify=get_option(config, 'DOWNLOAD.VERIFY', True),
+                                           session_cache=session_cache)
+    except Exception as e:
+        async for page_id, _ in _download_dirs():
+            on_error(jobs_by_id[page_id], e, None)
+        return
+
+    deadline = get_option(config, 'NOTION.EXPORT_DEADLINE', DEFAULT_EXPORT_DEADLINE)
+    # zip에서 바로 읽는 경우, 작은 export는 디스크에 쓰지 않고 메모리 buffer로 다운로드
+    spool_max_size = None
+    if not get_option(config, 'NOTION.EXTRACT', True) and get_option(config, 'NOTION.SPOOL_MAX_MB', 8) > 0:
+        spool_max_size = int(get_option(config, 'NOTION.SPOOL_MAX_MB', 8) * 1024 * 1024)
+    # pipeline이 가져가는 속도에 맞춰 다운로드 (다운로드 중이거나 대기 중인 zip 개수 제한)
+    download_buffer = get_option(config, 'NOTION.DOWNLOAD_BUFFER', DEFAULT_DOWNLOAD_BUFFER)
+    async for page_id, save_fp, error in exporter.export_many(_download_dirs(), exportType='markdown',
+                                                              deadline=deadline, spool_max_size=spool_max_size,
+                                                              download_buffer=download_buffer):
+        job = jobs_by_id[page_id]
+        job.export_fp = save_fp
+        job.error = error
+        yield job
+
+async def process_pages(config: EasyDict, pages: AsyncIterable[PageInfo]
+                        ) -> Tuple[List[PageInfo], List[PageInfo], List[PageInfo], str]:
+    """
+    pages를 pipeline으로 처리하고 (전체, 성공, 실패 페이지, stage report) 반환
+    """
+    ctx = RunContext(config)
+    jobs, failed_jobs = [], []
+
+    def on_error(job: PageJob, e: Exception, stage: Optional[Union[Stage, str]]) -> None:
+        stage_name = stage.name if isinstance(stage, Stage) else (stage or 'prepare')
+        logger.error(f'Error processing {job.page.name} ({stage_name}): {str(e)}')
+        logger.error(traceback.format_exc())
+        failed_jobs.append(job)
+        try:
+            cleanup_workspace(job)
+        except Exception as cleanup_error:
+            logger.error(f'Failed to delete workspace: {job.workspace} ({cleanup_error})')
+
+    pipeline = build_pipeline(ctx, on_error)
+    try:
+        succeed_jobs = await pipeline.run(export_pages(ctx, pages, jobs, on_error))
+        await publish_pending(ctx, on_error)
+        await finish_status_updates(ctx, on_error)
+    finally:
+        # 중간에 실패한 page에서 업로드한 이미지 url도 저장
+        if ctx.image_cache is not None:
+            await ctx.image_cache.flush()
+        # 발행 정보는 page마다 저장하지 않고 실행 마지막에 한번 저장
+        if ctx.sync_state is not None:
+            await ctx.sync_state.flush()
+        ctx.close()
+    succeed_jobs = [job for job in succeed_jobs if not any(job is failed for failed in failed_jobs)]
+
+    all_pages = [job.page for job in jobs]
+    succeed_pages = [job.page for job in sorted(succeed_jobs, key=lambda job: job.index)]
+    failed_pages = [job.page for job in sorted(failed_jobs, key=lambda job: job.index)]
+    report = pipeline.report()
+    run_report = ctx.report()
+    if run_report:
+        report += '\n' + run_report
+    return all_pages, succeed_pages, failed_pages, report
+
+def generate_result_message(config: EasyDict, pages: List[PageInfo], succeed_pages: List[PageInfo], failed_pages: List[PageInfo],
+                            stage_report: str = '') -> str:
     msg = f'Total pages: {len(pages)}\n'
     if succeed_pages:
         msg += f'Succeed pages: {len(succeed_pages)}\n'
@@ -95,6 +396,10 @@ def generate_result_message(config: EasyDict, pages: List[PageInfo], succeed_pag
         msg += f'Failed pages: {len(failed_pages)}\n'
         for i, page in enumerate(failed_pages, start=1):
             msg += f'\t[{i}] {page.name}\n'
+    if stage_report:
+        msg += 'Stages:\n'
+        for line in stage_report.split('\n'):
+            msg += f'\t{line}\n'
     return msg
 
 def send_notifications(config: EasyDict, msg: str, succeed_count: int, total_count: int) -> None:
@@ -110,16 +415,28 @@ def send_notifications(config: EasyDict, msg: str, succeed_count: int, total_cou
         )
         logger.info('Sent email to Gmail')
 
-def main(config: EasyDict) -> None:
-    pages = get_posting_pages(config)
-    succeed_pages, failed_pages = process_pages(config, pages)
-    
-    msg = generate_result_message(config, pages, succeed_pages, failed_pages)
+async def amain(config: EasyDict) -> None:
+    # 모든 remote 호출이 공유하는 connection pool 설정
+    configure_http_client(limit=get_option(config, 'HTTP.LIMIT', 100),
+                          limit_per_host=get_option(config, 'HTTP.LIMIT_PER_HOST', 20),
+                          keepalive_timeout=get_option(config, 'HTTP.KEEPALIVE_TIMEOUT', 30),
+                          timeout=get_option(config, 'HTTP.TIMEOUT', 300),
+                          max_retries=get_option(config, 'HTTP.MAX_RETRIES', DEFAULT_MAX_RETRIES))
+    try:
+        # 페이지 목록은 조회되는 대로 처리 (다음 목록 조회와 export가 동시에 진행됨)
+        pages, succeed_pages, failed_pages, stage_report = await process_pages(config, stream_posting_pages(config))
+    finally:
+        await close_http_client()
+
+    msg = generate_result_message(config, pages, succeed_pages, failed_pages, stage_report)
     logger.info(msg)
-    
-    send_notifications(config, msg, len(succeed_pages), len(pages))
+
+    await asyncio.to_thread(send_notifications, config, msg, len(succeed_pages), len(pages))
     logger.info('All processes completed!')
 
+def main(config: EasyDict) -> None:
+    asyncio.run(amain(config))
+
 if __name__ == '__main__':
     config = get_config()
     main(config)
@@ -5,7 +5,7 @@ from enum import Enum
 class CallOutEmoji(Enum):
     TIP = ["💡"]  # all the other emojis
     INFO = ["📌", "🔍", "📝", "📢", "📚", "📖"]
-    WARNING = ["⚠️", "⚡", "🚧", "🟠" "🟧"]
+    WARNING = ["⚠️", "⚡", "🚧", "🟠", "🟧"]
     DANGER = ["🔥", "🚨", "🚫", "❌", "🛑", "⛔"]
 
 
@@ -16,43 +16,51 @@ class PromptType(Enum):
     DANGER = "{: .prompt-danger }"
 
 
+# 이모지 -> prompt (이모지 뒤의 variation selector(U+FE0F)는 있어도 없어도 같은 이모지로 처리)
+PROMPT_BY_EMOJI = {emoji.replace('\ufe0f', ''): PromptType[callout.name].value
+                   for callout in CallOutEmoji for emoji in callout.value}
+DEFAULT_PROMPT = PromptType.TIP.value  # 목록에 없는 이모지
+
+# 기본으로 이모지로 표시되는 문자 (unicode Emoji_Presentation)
+# 기호 block(U+2000~U+2BFF)에서는 ⚡, ⛔, ❌, ⭐ 등 일부만 해당 (★, ✓, ➜ 같은 일반 기호는 제외)
+EMOJI_PRESENTATION_CHARS = ('\u231A\u231B\u23E9-\u23EC\u23F0\u23F3\u25FD\u25FE\u2614\u2615\u2648-\u2653\u267F'
+                            '\u2693\u26A1\u26AA\u26AB\u26BD\u26BE\u26C4\u26C5\u26CE\u26D4\u26EA\u26F2\u26F3'
+                            '\u26F5\u26FA\u26FD\u2705\u270A\u270B\u2728\u274C\u274E\u2753-\u2755\u2757'
+                            '\u2795-\u2797\u27B0\u27BF\u2B1B\u2B1C\u2B50\u2B55'
+                            '\U0001F004\U0001F0CF\U0001F170-\U0001F251\U0001F300-\U0001F64F\U0001F680-\U0001F6FF'
+                            '\U0001F7E0-\U0001F7EB\U0001F900-\U0001FAFF')
+# variation selector(U+FE0F)가 붙으면 이모지로 표시되는 기호 (ex. ⚠️, ❤️, ✔️)
+SYMBOL_CHARS = '\u00A9\u00AE\u2000-\u2BFF\u3030\u303D\u3297\u3299'
+# 하나의 이모지: 목록에 있는 이모지(variation selector 없어도 됨), 이모지 문자, 기호 + variation selector, keycap
+# (뒤에 붙는 variation selector, 피부색, ZWJ로 이어진 이모지, 국기 등 연속된 이모지 문자도 포함)
+EMOJI_PATTERN = (rf"(?:{''.join(re.escape(emoji) + '|' for emoji in PROMPT_BY_EMOJI if len(emoji) > 1)}"
+                 rf"[{''.join(emoji for emoji in PROMPT_BY_EMOJI if len(emoji) == 1)}{EMOJI_PRESENTATION_CHARS}]"
+                 rf"|[{SYMBOL_CHARS}]\ufe0f|[0-9#*]\ufe0f?\u20e3)"
+                 rf"(?:\ufe0f|\u20e3|[{EMOJI_PRESENTATION_CHARS}]|\u200d[{EMOJI_PRESENTATION_CHARS}{SYMBOL_CHARS}])*")
+# callout 내용 앞의 이모지 (이모지 앞뒤의 공백, 빈 줄 포함)
+CALLOUT_EMOJI_PATTERN = re.compile(rf"\s*({EMOJI_PATTERN})\s*")
+
+
 def set_prompt_type(emoji):
-    if emoji in CallOutEmoji.INFO.value:
-        return PromptType.INFO.value
-    elif emoji in CallOutEmoji.WARNING.value:
-        return PromptType.WARNING.value
-    elif emoji in CallOutEmoji.DANGER.value:
-        return PromptType.DANGER.value
-    else:
-        return PromptType.TIP.value
+    return PROMPT_BY_EMOJI.get(emoji.replace('\ufe0f', ''), DEFAULT_PROMPT)
+
+
+def render_callout(emoji: str, content: str) -> str:
+    """callout 내용을 chirpy prompt로 변환 (줄마다 '> ' 추가 후 prompt 지정, 다음 내용과 한 줄 띄움)"""
+    content = content.replace('\n', '\n> ')
+    return f'> {content}\n{set_prompt_type(emoji)}\n'
 
 
 def transform_callout(md_text):
     """
         notion의 callout 블록은 markdown 출력시 <aside>로 변환됨
-        따라서 <aside> 태그를 찾아서 이모지를 제거하고 chirpy의 prompt-tip으로 출력하도록 변환
+        따라서 <aside> 태그를 찾아서 이모지를 제거하고 chirpy의 prompt로 출력하도록 변환
+        (markdown engine이 한번 읽으면서 <aside>, </aside>의 짝을 맞추므로 중첩, 연속된 callout도 변환)
     """
-    # 패턴: <aside> ... 이모지 ... </aside> 를 찾음
-    pattern = re.compile(r"<aside>\s*([\U0001F000-\U0001FFFF])\s*(.*?)\s*</aside>", re.DOTALL)
-
-    def replace_newlines(match):
-        emoji = match.group(1)
-        content = match.group(2).strip()
-
-        # prompt 설정
-        prompt = set_prompt_type(emoji)
-
-        # content의 줄바꿈을 처리
-        content = content.split('\n')
-        content = ['> ' + line for line in content]
-        content = '\n'.join(content)
+    # markdown_engine이 이 모듈을 사용하므로 함수 안에서 import
+    from src.markdown_engine import MarkdownEngine
 
-        return f"{content}\n{prompt}\n"
-
-    # 대체 작업
-    transformed_text = pattern.sub(replace_newlines, md_text)
-
-    return transformed_text
+    return MarkdownEngine().render(md_text)[0]
 
 
 if __name__ == '__main__':
@@ -121,6 +129,13 @@ $$
 
 후후..
 
+<aside>
+⚠️
+
+중첩된 callout
+
+</aside>
+
 </aside>
 
     """
@@ -0,0 +1,141 @@
+import asyncio
+import math
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from src.loggers import get_logger
+
+logger = get_logger(logger_name='notion2md')
+
+# 서비스별 기본 동시 요청 수 (시작 값, 최대 값)
+SERVICE_CONCURRENCY: Dict[str, Tuple[int, int]] = {
+    'notion_export_task': (4, 16),  # notion에서 동시에 진행하는 export task (등록부터 완료까지)
+    'imgur': (4, 16),
+    'github': (4, 16),
+}
+
+DECREASE_FACTOR = 0.5  # 과부하 신호가 오면 limit에 곱하는 값
+LATENCY_SPIKE_FACTOR = 3.0  # 평소 응답 시간의 몇 배를 넘으면 과부하로 판단할지
+MIN_SPIKE_LATENCY = 1.0  # 과부하로 판단할 최소 응답 시간(초, 빠른 요청의 작은 변동은 무시)
+LATENCY_EWMA_ALPHA = 0.1  # 평소 응답 시간(지수 이동 평균)에 새 응답 시간을 반영하는 비율
+
+
+class AIMDLimiter:
+    """
+    AIMD(additive increase, multiplicative decrease) 방식으로 동시 요청 수를 조절
+        - 응답 시간과 응답이 정상이면 limit개의 요청이 성공할 때마다 limit을 1씩 증가
+        - 429, 5xx, timeout 또는 응답 시간이 평소보다 크게 늘어나면 limit을 절반으로 감소
+    limit을 줄인 뒤에는 그 이전에 시작된 요청의 결과로 다시 줄이지 않음 (한번의 과부하로 limit이 여러번 줄지 않도록)
+    """
+
+    def __init__(self, name: str, initial: int, max_limit: int, min_limit: int = 1):
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = min(max(initial, self.min_limit), self.max_limit)
+        self.in_flight = 0
+        self.latency: Optional[float] = None  # 정상 응답의 평균 응답 시간(초)
+
+        self.peak = self.limit
+        self.increases = 0
+        self.decreases = 0
+        self._successes = 0
+        self._decreased_at = 0.0
+        self._condition: Optional[asyncio.Condition] = None  # event loop 안에서 생성
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator['_Slot']:
+        """
+        limit개의 요청이 실행중이면 대기 후 실행 (결과는 블록 안에서 success/overload로 기록)
+        """
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+        started_at = time.monotonic()
+        try:
+            yield _Slot(self, started_at)
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def _on_success(self, started_at: float, check_latency: bool = True) -> None:
+        # 업로드 등 body 크기에 따라 응답 시간이 달라지는 요청은 응답 시간을 과부하 판단, 평균에 사용하지 않음
+        if check_latency:
+            latency = time.monotonic() - started_at
+            if self.latency is not None and latency > max(self.latency * LATENCY_SPIKE_FACTOR, MIN_SPIKE_LATENCY):
+                self._on_overload(started_at, f'latency {latency:.1f}s (avg {self.latency:.1f}s)')
+                return
+            self.latency = latency if self.latency is None else \
+                (1 - LATENCY_EWMA_ALPHA) * self.latency + LATENCY_EWMA_ALPHA * latency
+
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.max_limit:
+            self._successes = 0
+            self.limit += 1
+            self.increases += 1
+            self.peak = max(self.peak, self.limit)
+
+    def _on_overload(self, started_at: float, reason: str) -> None:
+        self._successes = 0
+        if started_at < self._decreased_at or self.limit == self.min_limit:
+            return
+        old_limit = self.limit
+        self.limit = max(self.min_limit, math.floor(self.limit * DECREASE_FACTOR))
+        self.decreases += 1
+        self._decreased_at = time.monotonic()
+        logger.warning(f'[{self.name}] concurrency limit {old_limit} -> {self.limit} ({reason})')
+
+    def __str__(self):
+        return (f'{self.name}: concurrency {self.limit} (peak {self.peak}, max {self.max_limit}, '
+                f'+{self.increases}/-{self.decreases})')
+
+
+class _Slot:
+    """slot()에서 반환, 요청 결과 기록용"""
+
+    def __init__(self, limiter: AIMDLimiter, started_at: float):
+        self.limiter = limiter
+        self.started_at = started_at
+
+    def success(self, check_latency: bool = True) -> None:
+        """check_latency가 False이면 응답 시간으로 과부하를 판단하지 않음 (응답이 정상인 것만 반영)"""
+        self.limiter._on_success(self.started_at, check_latency)
+
+    def overload(self, reason: str) -> None:
+        self.limiter._on_overload(self.started_at, reason)
+
+
+_limiters: Dict[str, AIMDLimiter] = {}
+
+
+def configure_concurrency(service: str, initial: Optional[int] = None, max_limit: Optional[int] = None) -> AIMDLimiter:
+    """서비스의 동시 요청 수 설정 (값이 없으면 SERVICE_CONCURRENCY의 기본값 사용)"""
+    default_initial, default_max = SERVICE_CONCURRENCY.get(service, (1, 1))
+    _limiters[service] = AIMDLimiter(service,
+                                     default_initial if initial is None else initial,
+                                     default_max if max_limit is None else max_limit)
+    return _limiters[service]
+
+
+def get_concurrency_limiter(service: Optional[str]) -> Optional[AIMDLimiter]:
+    """
+    서비스의 모든 요청이 공유하는 동시 요청 수 limiter
+    SERVICE_CONCURRENCY에 없는 서비스는 제한하지 않음 (None)
+    """
+    if service is None:
+        return None
+    limiter = _limiters.get(service)
+    if limiter is None and service in SERVICE_CONCURRENCY:
+        limiter = configure_concurrency(service)
+    return limiter
+
+
+def concurrency_report() -> str:
+    """사용된 서비스의 현재 동시 요청 수 (실행 결과 메시지용)"""
+    return '\n'.join(str(limiter) for limiter in _limiters.values() if limiter.increases or limiter.decreases
+                     or limiter.latency is not None)
@@ -1,9 +1,14 @@
 from datetime import datetime
 
 
-def convert_date_format(date_str):
+def convert_date_format(date_str, published_date=None):
+    """
+    published_date: 이전에 발행한 post의 date (날짜가 같으면 그대로 사용하여 다시 발행해도 post 내용이 바뀌지 않음)
+    """
     # datetime 객체로 변환
     date_object = datetime.strptime(date_str, '%Y년 %m월 %d일')
+    if published_date is not None and published_date.startswith(date_object.strftime('%Y-%m-%d ')):
+        return published_date
 
     # 현재 시간 가져오기 (시, 분, 초)
     current_time = datetime.now()
@@ -0,0 +1,182 @@
+import asyncio
+import random
+import re
+import zipfile
+from typing import BinaryIO, Dict, Optional, Tuple
+
+import aiohttp
+from tqdm import tqdm
+
+from src.http_client import get_http_client
+from src.loggers import get_logger
+from src.retry import MAX_RETRY_WAIT, retry_after_delay, should_retry
+
+logger = get_logger(logger_name='notion2md')
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # 한번에 읽을 크기 (1MB)
+DEFAULT_RETRIES = 3  # 연결이 끊긴 경우 이어받기 시도 횟수
+DEFAULT_PARALLEL = 1  # 큰 파일을 나눠서 동시에 받을 연결 수 (1이면 나누지 않음)
+DEFAULT_PARALLEL_MIN_SIZE = 32 * 1024 * 1024  # 나눠서 받을 최소 파일 크기 (32MB)
+
+CONTENT_RANGE_PATTERN = re.compile(r'bytes (\d+)-(\d+)/(\d+)')
+
+# 이어받기를 시도할 에러 (연결 끊김, 응답 중단, timeout)
+RESUMABLE_ERRORS = (aiohttp.ClientPayloadError, aiohttp.ClientConnectionError, asyncio.TimeoutError)
+# 재시도할 수 있는지 확인할 에러 (429, 5xx 응답은 공유 retry 정책과 같은 기준으로 재시도)
+RETRYABLE_ERRORS = RESUMABLE_ERRORS + (aiohttp.ClientResponseError,)
+
+
+class DownloadError(Exception):
+    pass
+
+
+def verify_zip(zip_file) -> None:
+    """
+    zip 파일의 모든 member CRC 확인 (손상된 경우 DownloadError)
+    Args:
+        zip_file: zip 파일 경로 또는 파일 객체 (확인 후 처음 위치로 되돌림)
+    """
+    try:
+        with zipfile.ZipFile(zip_file) as z:
+            bad_member = z.testzip()
+    except zipfile.BadZipFile as e:
+        raise DownloadError(f'[Error] 다운로드된 zip 파일이 올바르지 않습니다. ({e})')
+    finally:
+        if hasattr(zip_file, 'seek'):
+            zip_file.seek(0)
+
+    if bad_member is not None:
+        raise DownloadError(f'[Error] 다운로드된 zip 파일이 손상되었습니다. (member: {bad_member})')
+
+
+class Downloader:
+    """
+    공유 HTTP client(connection pool)로 파일 다운로드
+        - chunk_size 단위로 읽어서 저장
+        - 연결이 끊기면 Range 요청으로 받은 위치부터 이어받기
+        - parallel > 1이면 parallel_min_size 이상의 파일은 byte 범위를 나눠서 동시에 다운로드
+    """
+
+    def __init__(self,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 retries: int = DEFAULT_RETRIES,
+                 parallel: int = DEFAULT_PARALLEL,
+                 parallel_min_size: int = DEFAULT_PARALLEL_MIN_SIZE,
+                 progress: bool = False):
+        self.chunk_size = chunk_size
+        self.retries = retries
+        self.parallel = max(1, parallel)
+        self.parallel_min_size = parallel_min_size
+        self.progress = progress
+
+    async def download(self, url: str, f: BinaryIO, cookies: Optional[Dict[str, str]] = None) -> int:
+        """
+        url을 파일 객체 f에 다운로드하고 다운로드한 크기(byte) 반환
+        (f는 seek 가능해야 함, 나눠서 받는 경우 범위별로 위치를 옮겨가며 씀)
+        """
+        total_size, accepts_ranges = None, False
+        if self.parallel > 1:
+            total_size, accepts_ranges = await self._probe(url, cookies)
+
+        bar = tqdm(total=total_size or 0, unit='iB', unit_scale=True, disable=not self.progress)
+        try:
+            if accepts_ranges and total_size >= self.parallel_min_size:
+                part_size = -(-total_size // self.parallel)
+                await asyncio.gather(*(self._fetch(url, f, start, min(start + part_size, total_size) - 1,
+                                                   cookies, bar)
+                                       for start in range(0, total_size, part_size)))
+                size = total_size
+            else:
+                size = await self._fetch(url, f, 0, None, cookies, bar)
+        finally:
+            bar.close()
+
+        f.truncate(size)
+        return size
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """
+        다시 요청하기 전 대기할 시간(초), 재시도하지 않는 에러이거나 재시도 횟수를 넘으면 None
+            - 429, 5xx 응답: Retry-After가 있으면 그 시간만큼, 없으면 backoff (너무 오래 기다려야 하면 재시도하지 않음)
+            - 연결 끊김, 응답 중단, timeout: backoff
+        """
+        if attempt > self.retries:
+            return None
+        if isinstance(error, aiohttp.ClientResponseError):
+            headers = error.headers or {}
+            if not should_retry(error.status, headers, idempotent=True):
+                return None
+            delay = retry_after_delay(headers)
+            if delay is not None:
+                return delay if delay <= MAX_RETRY_WAIT else None
+        return min(2 ** attempt, 10) * random.uniform(0.5, 1.0)
+
+    async def _probe(self, url: str, cookies: Optional[Dict[str, str]]) -> Tuple[Optional[int], bool]:
+        """첫 1 byte만 요청하여 (전체 크기, Range 요청 지원 여부) 확인"""
+        attempt = 0
+        while True:
+            try:
+                async with get_http_client().stream('GET', url, allow_redirects=True, cookies=cookies,
+                                                    headers={'Range': 'bytes=0-0'}) as response:
+                    response.raise_for_status()
+                    match = CONTENT_RANGE_PATTERN.match(response.headers.get('Content-Range', ''))
+                    if response.status == 206 and match:
+                        return int(match.group(3)), True
+                    content_length = response.headers.get('Content-Length')
+                    return (int(content_length) if content_length else None), False
+            except RETRYABLE_ERRORS as e:
+                attempt += 1
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                logger.warning(f'Download probe failed, retrying in {delay:.1f}s ({attempt}/{self.retries}): {e}')
+                await asyncio.sleep(delay)
+
+    async def _fetch(self, url: str, f: BinaryIO, start: int, end: Optional[int],
+                     cookies: Optional[Dict[str, str]], bar: tqdm) -> int:
+        """
+        start ~ end byte를 f의 같은 위치에 저장 (end가 None이면 파일 끝까지), 저장한 마지막 위치 반환
+        연결이 끊기거나 429, 5xx 응답을 받으면 저장한 위치부터 Range 요청으로 이어받음
+        """
+        offset = start
+        expected_end = None if end is None else end + 1
+        attempt = 0
+        while True:
+            headers = {}
+            if offset > 0 or end is not None:
+                headers['Range'] = f'bytes={offset}-{"" if end is None else end}'
+
+            try:
+                async with get_http_client().stream('GET', url, allow_redirects=True, cookies=cookies,
+                                                    headers=headers) as response:
+                    response.raise_for_status()
+
+                    if 'Range' in headers and response.status != 206:
+                        # Range 요청을 지원하지 않는 서버는 처음부터 다시 받음
+                        if start > 0 or end is not None:
+                            raise DownloadError(f'[Error] Range 요청을 지원하지 않습니다. [{url}]')
+                        bar.update(-offset)
+                        offset, expected_end = 0, None
+
+                    if expected_end is None and response.headers.get('Content-Length'):
+                        expected_end = offset + int(response.headers['Content-Length'])
+                        bar.total = max(bar.total or 0, expected_end)
+
+                    async for data in response.content.iter_chunked(self.chunk_size):
+                        f.seek(offset)
+                        f.write(data)
+                        offset += len(data)
+                        bar.update(len(data))
+
+                if expected_end is not None and offset < expected_end:
+                    raise aiohttp.ClientPayloadError(f'Response ended at {offset} bytes, expected {expected_end}')
+                return offset
+
+            except RETRYABLE_ERRORS as e:
+                attempt += 1
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                logger.warning(f'Download interrupted at {offset} bytes, resuming in {delay:.1f}s '
+                               f'({attempt}/{self.retries}): {e}')
+                await asyncio.sleep(delay)
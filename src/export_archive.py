@@ -0,0 +1,109 @@
+import os
+import posixpath
+import zipfile
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import BinaryIO, List, Union
+
+from src.utils import expanduser
+
+
+class ExportArchive(ABC):
+    """
+    notion export 결과(markdown + 이미지)를 읽는 인터페이스
+        - DirectoryArchive: 압축 해제된 폴더에서 읽음
+        - ZipArchive: 압축 해제 없이 zip 파일에서 바로 읽음
+    member는 markdown 기준의 '/' 구분 상대 경로 (ex. 'page/image.png')
+    """
+    markdown_name: str  # markdown 파일의 member 이름
+
+    @abstractmethod
+    def open(self, member: str) -> BinaryIO:
+        """member를 binary 파일 객체로 열기"""
+
+    @abstractmethod
+    def size(self, member: str) -> int:
+        """member의 (압축 해제된) 크기"""
+
+    def read(self, member: str) -> bytes:
+        with self.open(member) as f:
+            return f.read()
+
+    def open_markdown(self) -> BinaryIO:
+        """markdown 파일 열기 (필요한 만큼만 이어서 읽음)"""
+        return self.open(self.markdown_name)
+
+    def resolve(self, rel_path: str) -> str:
+        """markdown에 쓰인 (decode된) 상대 경로를 member 이름으로 변환"""
+        return posixpath.normpath(posixpath.join(posixpath.dirname(self.markdown_name), rel_path))
+
+    def close(self) -> None:
+        pass
+
+
+class DirectoryArchive(ExportArchive):
+    """압축 해제된 export 폴더"""
+
+    def __init__(self, md_path: str):
+        self.root = os.path.dirname(md_path)
+        self.markdown_name = os.path.basename(md_path)
+
+    def open(self, member: str) -> BinaryIO:
+        return open(os.path.join(self.root, *member.split('/')), 'rb')
+
+    def size(self, member: str) -> int:
+        return os.path.getsize(os.path.join(self.root, *member.split('/')))
+
+    def __repr__(self):
+        return f'DirectoryArchive({os.path.join(self.root, self.markdown_name)})'
+
+
+class ZipArchive(ExportArchive):
+    """
+    export zip 파일을 압축 해제하지 않고 읽음 (markdown, 이미지는 필요할 때 zip에서 바로 읽음)
+    """
+
+    def __init__(self, zip_fp: Union[str, Path, BinaryIO]):
+        """
+        Args:
+            zip_fp: zip 파일 경로 또는 zip이 담긴 파일 객체 (메모리 buffer 등, close시 함께 닫음)
+        """
+        if isinstance(zip_fp, (str, Path)):
+            self.zip_fp = expanduser(str(zip_fp))
+            self._fileobj = None
+        else:
+            self.zip_fp = '<buffer>'
+            self._fileobj = zip_fp
+        try:
+            self._zip = zipfile.ZipFile(self._fileobj or self.zip_fp)
+            self.markdown_name = self._find_markdown()
+        except Exception:
+            self.close()
+            raise
+
+    def _find_markdown(self) -> str:
+        # markdown 파일은 한개여야함 (find_md_file과 동일)
+        pages = [name for name in self.namelist() if name.endswith('.md')]
+        if len(pages) == 0:
+            raise ValueError(f'[Error] 다운로드가 실패하였습니다. 경로를 다시 확인해주세요. Export File:[{self.zip_fp}]')
+        elif len(pages) > 1:
+            raise ValueError(f'[Error] 다운로드된 파일이 여러개입니다. 경로를 다시 확인해주세요. Export File:[{self.zip_fp}]')
+        return pages[0]
+
+    def namelist(self) -> List[str]:
+        return [name for name in self._zip.namelist() if not name.endswith('/')]
+
+    def open(self, member: str) -> BinaryIO:
+        return self._zip.open(member)
+
+    def size(self, member: str) -> int:
+        return self._zip.getinfo(member).file_size
+
+    def close(self) -> None:
+        if getattr(self, '_zip', None) is not None:
+            self._zip.close()
+        if self._fileobj is not None:
+            self._fileobj.close()
+
+    def __repr__(self):
+        return f'ZipArchive({self.zip_fp}:{self.markdown_name})'
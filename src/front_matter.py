@@ -0,0 +1,113 @@
+from typing import BinaryIO, Dict, Iterable, Iterator, Mapping, Optional, Sequence, Tuple, Union
+
+from easydict import EasyDict
+
+from src.dateformat import convert_date_format
+from src.loggers import get_logger
+from src.markdown_engine import Document
+from src.models import FrontMatter
+from src.utils import get_option
+
+logger = get_logger(logger_name='notion2md')
+
+# chirpy front matter key -> notion 컬럼 (여러 컬럼이면 ', '로 합침)
+DEFAULT_COLUMNS: Dict[str, Union[str, Sequence[str]]] = {
+    'title': 'title',
+    'description': 'description',
+    'date': 'date',
+    'categories': ('category1', 'category2'),
+    'tags': 'tags',
+    'author': 'author',
+    'pin': 'pin',
+    'math': 'math',
+    'mermaid': 'mermaid',
+    'uid': 'uid',
+}
+ESSENTIAL_KEYS = ('title', 'date', 'categories', 'tags', 'uid')
+LIST_KEYS = ('categories', 'tags')  # A, B, C -> [A, B, C]
+
+
+class FrontMatterMapping:
+    """
+    notion 컬럼 정보(key: value)를 chirpy front matter로 변환하는 규칙
+    config에서 한번만 만들어서 모든 page에 사용 (page마다 key 목록을 다시 만들지 않음)
+    """
+
+    def __init__(self, columns: Optional[Mapping[str, Union[str, Sequence[str]]]] = None):
+        """
+        Args:
+            columns: front matter key -> notion 컬럼 이름 (또는 합칠 컬럼 목록), 없으면 DEFAULT_COLUMNS
+        """
+        columns = DEFAULT_COLUMNS if columns is None else columns
+        self.sources: Dict[str, Tuple[str, ...]] = {
+            key: (column,) if isinstance(column, str) else tuple(column) for key, column in columns.items()}
+        # header에서 읽을 notion 컬럼 (나머지 컬럼은 무시)
+        self.columns = frozenset(column for sources in self.sources.values() for column in sources)
+
+    @classmethod
+    def from_config(cls, config: EasyDict) -> 'FrontMatterMapping':
+        """uid 컬럼은 NOTION.COLUMN.UID.NAME, 나머지는 FRONT_MATTER.COLUMNS로 변경 (없으면 기본값 사용)"""
+        columns = dict(DEFAULT_COLUMNS)
+        columns['uid'] = get_option(config, 'NOTION.COLUMN.UID.NAME', columns['uid'])
+        columns.update(get_option(config, 'FRONT_MATTER.COLUMNS', {}))
+        return cls(columns)
+
+    def parse(self, lines: Iterable[str]) -> Dict[str, str]:
+        """컬럼 정보 줄(key: value)에서 사용하는 컬럼의 값만 반환"""
+        values = {}
+        for line in lines:
+            column, _, value = line.rstrip('\n').partition(': ')
+            if column in self.columns:
+                values[column] = value
+        return values
+
+    def read_header(self, f: BinaryIO) -> Dict[str, str]:
+        """
+        notion markdown(binary file 객체)의 제목 줄 다음부터 빈 줄까지의 컬럼 정보만 읽어서 parse
+        f는 본문 시작 위치에 남으므로 본문은 필요할 때 이어서 읽음 (header를 위해 파일 전체를 읽지 않음)
+        """
+        # delete 1 row title
+        for _ in _read_block(f):
+            pass
+        return self.parse(_read_block(f))
+
+    def build(self, values: Dict[str, str], doc: Document, published_date: Optional[str] = None) -> FrontMatter:
+        """
+        parse한 컬럼 값을 front matter로 변환 (수식, mermaid 여부는 본문을 읽으면서 확인한 doc 사용)
+        published_date: 이전에 발행한 post의 date (날짜가 같으면 발행 시각을 그대로 사용)
+        """
+        front_matter = {}
+        for key, sources in self.sources.items():
+            missing = [column for column in sources if column not in values]
+            if not missing:
+                front_matter[key] = ', '.join(values[column] for column in sources)
+            elif key in ESSENTIAL_KEYS:
+                # validate essential keys
+                logger.error(f'Essential key not found: {key} (column: {", ".join(missing)})')
+                raise KeyError(f'Essential key not found: {key}')
+
+        # add math, mermaid if exist
+        if doc.math:
+            front_matter['math'] = 'true'
+        if doc.mermaid:
+            front_matter['mermaid'] = 'true'
+
+        # apply date format (2024년 9월 21일 오전 12:00 (GMT+9) -> 2024-09-21 00:00:00 +0900)
+        front_matter['date'] = convert_date_format(front_matter['date'], published_date)
+
+        # convert A, B, C -> [A, B, C]
+        for key in LIST_KEYS:
+            front_matter[key] = front_matter[key].split(', ')
+
+        return FrontMatter(**front_matter)
+
+
+def _read_block(f: BinaryIO) -> Iterator[str]:
+    # 빈 줄(또는 파일 끝)까지 한 줄씩 읽어서 decode (빈 줄은 읽고 버림)
+    for line in iter(f.readline, b''):
+        if line == b'\n':
+            return
+        yield line.decode('utf-8')
+
+
+default_mapping = FrontMatterMapping()
@@ -0,0 +1,121 @@
+"""
+chirpy front matter를 yaml.dump(default_flow_style=False, allow_unicode=True)와 같은 형식으로 출력
+front matter는 key가 정해져 있고 값은 str, int, bool, None, str list이므로 yaml.dump 대신 template으로 직접 출력
+    - key 정렬, list는 block 형식 (- item)
+    - 문자열은 yaml emitter와 같은 규칙으로 plain / 작은따옴표 출력, 80자를 넘으면 같은 위치에서 줄바꿈
+    - 큰따옴표(escape)가 필요한 문자열 등 template으로 처리하지 않는 값이 있으면 yaml.dump 사용
+libyaml(CDumper)은 이모지 등 BMP 밖의 문자를 escape하고 큰따옴표 문자열의 줄바꿈 위치가 달라서 사용하지 않음
+"""
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+import yaml
+from yaml.resolver import Resolver
+
+BEST_WIDTH = 80  # yaml emitter의 기본 줄 길이 (넘으면 공백 위치에서 줄바꿈)
+INDENT = '  '  # 줄바꿈된 값의 들여쓰기
+
+STR_TAG = 'tag:yaml.org,2002:str'
+_resolver = Resolver()
+
+# 큰따옴표로 escape해야 하는 문자 (줄바꿈, 제어 문자, 출력할 수 없는 unicode)
+DOUBLE_QUOTED_PATTERN = re.compile(r'[^\x20-\x7E\xA0-\uD7FF\uE000-\uFEFE\uFF00-\uFFFD\U00010000-\U0010FFFE]'
+                                   r'|[\u2028\u2029]')
+# plain으로 쓸 수 없는 문자열 (block indicator로 시작하거나 ': ', ' #'가 있는 경우, 앞뒤 공백)
+NOT_PLAIN_PATTERN = re.compile(r'''^(?:---|\.\.\.|[#,\[\]{}&*!|>'"%@`]|[?:-](?: |$))|: |:$| #|^ | $''')
+SIMPLE_KEY_PATTERN = re.compile(r'[a-z][a-z_]*')
+SPACES_PATTERN = re.compile('( +)')
+
+
+def dump_front_matter(data: Dict[str, Any]) -> str:
+    """yaml.dump(data, default_flow_style=False, allow_unicode=True)와 같은 결과 반환"""
+    lines = _dump_lines(data)
+    if lines is None:
+        return yaml.dump(data, default_flow_style=False, allow_unicode=True)
+    lines.append('')
+    return '\n'.join(lines)
+
+
+def _dump_lines(data: Dict[str, Any]) -> Optional[List[str]]:
+    # template으로 출력할 수 없는 값이 있으면 None
+    lines = []
+    for key in sorted(data):
+        if not _is_simple_key(key):
+            return None
+        value = data[key]
+        if isinstance(value, list):
+            if not value:
+                return None
+            lines.append(f'{key}:')
+            for item in value:
+                item = _scalar(item, len('- '))
+                if item is None:
+                    return None
+                lines.append(f'- {item}')
+        else:
+            value = _scalar(value, len(key) + len(': '))
+            if value is None:
+                return None
+            lines.append(f'{key}: {value}')
+    return lines
+
+
+def _scalar(value: Any, column: int) -> Optional[str]:
+    """column 위치부터 쓰는 값 (template으로 출력할 수 없으면 None)"""
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return str(value)
+    if not isinstance(value, str):
+        return None
+    return _string(value, column)
+
+
+@lru_cache(maxsize=1024)
+def _string(value: str, column: int) -> Optional[str]:
+    # category, tag는 page마다 반복되므로 결과를 저장해서 사용
+    if not value:
+        return "''"
+    if DOUBLE_QUOTED_PATTERN.search(value):
+        return None
+    if _is_plain_str(value) and not NOT_PLAIN_PATTERN.search(value):
+        return _fold(value, column, quoted=False)
+    # 다른 type(숫자, bool, 날짜 등)으로 읽히거나 indicator가 있는 문자열은 작은따옴표 (' -> '')
+    return f"'{_fold(value, column + 1, quoted=True)}'"
+
+
+@lru_cache(maxsize=None)
+def _is_simple_key(key: str) -> bool:
+    return SIMPLE_KEY_PATTERN.fullmatch(key) is not None and _is_plain_str(key)
+
+
+def _is_plain_str(value: str) -> bool:
+    # 따옴표 없이 썼을 때 문자열로 읽히는지 (yaml.dump와 같은 resolver 사용, 'yes', '1.5', 'null' 등은 False)
+    return _resolver.resolve(yaml.ScalarNode, value, (True, False)) == STR_TAG
+
+
+def _fold(text: str, column: int, quoted: bool) -> str:
+    """
+    yaml emitter와 같은 위치에서 줄바꿈 (80자를 넘은 뒤의 공백 한 칸을 줄바꿈, 들여쓰기로 변경)
+    작은따옴표 문자열은 맨 앞, 맨 뒤의 공백에서는 줄바꿈하지 않음
+    """
+    if quoted:
+        text = text.replace("'", "''")
+    if column + len(text) <= BEST_WIDTH + 1:
+        return text
+
+    parts = SPACES_PATTERN.split(text)  # [단어, 공백, 단어, ...]
+    last = len(parts) - 2
+    out = []
+    for i, part in enumerate(parts):
+        if i % 2 == 1 and part == ' ' and column > BEST_WIDTH and \
+                not (quoted and ((i == 1 and not parts[0]) or (i == last and not parts[-1]))):
+            out.append('\n' + INDENT)
+            column = len(INDENT)
+        else:
+            out.append(part)
+            column += len(part)
+    return ''.join(out)
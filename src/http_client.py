@@ -0,0 +1,213 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager, nullcontext
+from typing import AsyncIterator, Optional
+
+import aiohttp
+
+from src.concurrency import get_concurrency_limiter
+from src.loggers import get_logger
+from src.rate_limit import get_rate_limiter
+from src.retry import (DEFAULT_MAX_RETRIES, IDEMPOTENT_METHODS, MAX_RETRY_WAIT, RETRY_STATUSES, backoff_delay,
+                       is_rate_limited, retry_after_delay, should_retry)
+
+logger = get_logger(logger_name='notion2md')
+
+DEFAULT_LIMIT = 100  # 전체 동시 연결 수
+DEFAULT_LIMIT_PER_HOST = 20  # host별 동시 연결 수
+DEFAULT_KEEPALIVE_TIMEOUT = 30  # 사용하지 않는 연결을 유지하는 시간(초)
+DEFAULT_TIMEOUT = 300  # 요청 전체 timeout(초)
+
+
+class HTTPError(Exception):
+    def __init__(self, response: 'HTTPResponse'):
+        self.response = response
+        self.status = response.status
+        super().__init__(f'{response.status} Error for url: {response.url} ({response.text[:200]})')
+
+
+class HTTPResponse:
+    """body를 모두 읽은 응답 (연결은 pool로 반환된 상태)"""
+
+    def __init__(self, status: int, headers: dict, body: bytes, url: str):
+        self.status = status
+        self.status_code = status  # requests 호환
+        self.headers = headers
+        self.body = body
+        self.url = url
+
+    @property
+    def ok(self) -> bool:
+        return self.status < 400
+
+    @property
+    def text(self) -> str:
+        return self.body.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.body)
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise HTTPError(self)
+
+
+class AsyncHTTPClient:
+    """
+    asyncio 기반 HTTP client
+    하나의 session(connection pool)을 공유하므로 host별로 keep-alive 연결이 재사용되고,
+    하나의 thread에서 여러 요청을 동시에 처리할 수 있음
+    service를 지정한 요청은 서비스별 rate limiter를 거치며, 429/5xx 응답은 Retry-After 또는 backoff 후 재시도
+    """
+
+    def __init__(self,
+                 limit: int = DEFAULT_LIMIT,
+                 limit_per_host: int = DEFAULT_LIMIT_PER_HOST,
+                 keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 max_retries: int = DEFAULT_MAX_RETRIES):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # session은 event loop 안에서 생성되어야 하므로 처음 사용할 때 생성
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit,
+                                             limit_per_host=self.limit_per_host,
+                                             keepalive_timeout=self.keepalive_timeout)
+            self._session = aiohttp.ClientSession(connector=connector,
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout),
+                                                  # cookie는 요청마다 지정 (notion token 등이 다른 요청에 섞이지 않도록)
+                                                  cookie_jar=aiohttp.DummyCookieJar())
+        return self._session
+
+    async def request(self, method: str, url: str, service: Optional[str] = None,
+                      idempotent: Optional[bool] = None, check_latency: bool = True, **kwargs) -> HTTPResponse:
+        """
+        Args:
+            service: 요청 속도, 동시 요청 수를 제한할 서비스 (ex. 'imgur', 'github'), 같은 서비스의 모든 요청이 limiter를 공유
+            idempotent: 5xx, 연결 에러시 재시도 여부 (없으면 method로 판단, rate limit 응답은 항상 재시도)
+            check_latency: 응답 시간으로 과부하를 판단할지 여부 (업로드처럼 body 크기에 따라 응답 시간이 달라지면 False)
+            data: 재시도할 때 body를 다시 만들어야 하는 경우(파일 업로드 등) body를 반환하는 함수
+        """
+        limiter = get_rate_limiter(service)
+        concurrency = get_concurrency_limiter(service)
+        if idempotent is None:
+            idempotent = method.upper() in IDEMPOTENT_METHODS
+        data = kwargs.pop('data', None)
+
+        for attempt in range(self.max_retries + 1):
+            if limiter is not None:
+                await limiter.acquire()
+            if callable(data):
+                kwargs['data'] = data()
+            elif data is not None:
+                kwargs['data'] = data
+
+            # 동시 요청 수는 응답 시간, 429/5xx/timeout에 따라 조절 (재시도 대기 중에는 slot을 차지하지 않음)
+            error = None
+            async with (concurrency.slot() if concurrency is not None else nullcontext()) as slot:
+                try:
+                    async with self.session.request(method, url, **kwargs) as response:
+                        body = await response.read()
+                        result = HTTPResponse(response.status, dict(response.headers), body, str(response.url))
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                    error = e
+                if slot is not None:
+                    if error is not None:
+                        slot.overload(repr(error))
+                    elif is_rate_limited(result.status, result.headers) or result.status in RETRY_STATUSES:
+                        slot.overload(f'status {result.status}')
+                    else:
+                        slot.success(check_latency)
+
+            if error is not None:
+                if not idempotent or attempt == self.max_retries:
+                    raise error
+                delay = backoff_delay(attempt)
+                logger.warning(f'[{service or "http"}] {method} {url} failed ({error!r}), retry in {delay:.1f}s '
+                               f'({attempt + 1}/{self.max_retries})')
+                await asyncio.sleep(delay)
+                continue
+
+            # 서버가 요청 속도를 줄이라고 한 경우 같은 서비스의 다른 요청도 함께 대기
+            server_delay = retry_after_delay(result.headers)
+            if server_delay is not None and limiter is not None:
+                limiter.pause(min(server_delay, MAX_RETRY_WAIT))
+
+            if attempt == self.max_retries or not should_retry(result.status, result.headers, idempotent):
+                return result
+            delay = backoff_delay(attempt) if server_delay is None else server_delay
+            if delay > MAX_RETRY_WAIT:
+                return result
+            logger.warning(f'[{service or "http"}] {method} {url} returned {result.status}, retry in {delay:.1f}s '
+                           f'({attempt + 1}/{self.max_retries})')
+            await asyncio.sleep(delay)
+        return result
+
+    async def get(self, url: str, **kwargs) -> HTTPResponse:
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> HTTPResponse:
+        return await self.request('POST', url, **kwargs)
+
+    async def put(self, url: str, **kwargs) -> HTTPResponse:
+        return await self.request('PUT', url, **kwargs)
+
+    async def patch(self, url: str, **kwargs) -> HTTPResponse:
+        return await self.request('PATCH', url, **kwargs)
+
+    @asynccontextmanager
+    async def stream(self, method: str, url: str, service: Optional[str] = None,
+                     **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+        """body를 chunk 단위로 읽어야 하는 경우 (파일 다운로드 등, 재시도는 호출하는 쪽에서 처리)"""
+        limiter = get_rate_limiter(service)
+        if limiter is not None:
+            await limiter.acquire()
+        async with self.session.request(method, url, **kwargs) as response:
+            yield response
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+_client: Optional[AsyncHTTPClient] = None
+
+
+def configure_http_client(**kwargs) -> AsyncHTTPClient:
+    """공유 client 설정 (요청을 보내기 전, 실행 시작 시 호출)"""
+    global _client
+    _client = AsyncHTTPClient(**kwargs)
+    return _client
+
+
+def get_http_client() -> AsyncHTTPClient:
+    """모든 remote 호출이 공유하는 client"""
+    global _client
+    if _client is None:
+        _client = AsyncHTTPClient()
+    return _client
+
+
+async def close_http_client() -> None:
+    if _client is not None:
+        await _client.close()
+
+
+def run(coro):
+    """동기 코드(스크립트 실행 등)에서 coroutine 실행 후 공유 client 정리"""
+
+    async def _run():
+        try:
+            return await coro
+        finally:
+            await close_http_client()
+
+    return asyncio.run(_run())
@@ -0,0 +1,69 @@
+import asyncio
+import hashlib
+import json
+import os
+from typing import BinaryIO, Dict, Optional
+
+from src.loggers import get_logger
+from src.utils import expanduser
+
+logger = get_logger(logger_name='notion2md')
+
+HASH_BLOCK_SIZE = 1024 * 1024  # hash 계산시 한번에 읽을 크기 (1MB)
+
+
+def stream_hash(f: BinaryIO) -> str:
+    """파일 객체(일반 파일, zip member 등) 내용의 sha256 hash"""
+    h = hashlib.sha256()
+    for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+        h.update(block)
+    return h.hexdigest()
+
+
+class ImageCache:
+    """
+    이미지 내용(hash) -> 업로드된 url 저장 (이전 실행에서 업로드한 이미지는 다시 업로드하지 않음)
+    set은 메모리에만 반영하고, 파일은 flush에서 page마다 한번 저장
+    """
+
+    def __init__(self, path: str):
+        self.path = expanduser(path)
+        self.urls: Dict[str, str] = {}
+        self.dirty = False  # 저장하지 않은 변경 여부
+        self._save_lock = asyncio.Lock()
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.urls = json.load(f)
+            except Exception as e:
+                logger.warning(f'Failed to read image cache, starting from empty cache: {self.path} ({e})')
+
+    def get(self, digest: str) -> Optional[str]:
+        return self.urls.get(digest)
+
+    def set(self, digest: str, url: str) -> None:
+        self.urls[digest] = url
+        self.dirty = True
+
+    async def flush(self) -> None:
+        """변경된 내용이 있으면 thread에서 저장 (실패해도 다음 flush에서 다시 저장)"""
+        async with self._save_lock:
+            if not self.dirty:
+                return
+            self.dirty = False
+            urls = dict(self.urls)  # 저장하는 동안 다른 page에서 추가되는 url과 분리
+            try:
+                await asyncio.to_thread(self._write, urls)
+            except Exception as e:
+                self.dirty = True
+                logger.warning(f'Failed to save image cache: {self.path} ({e})')
+
+    def _write(self, urls: Dict[str, str]) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        # 저장 중 중단되어도 기존 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(urls, f, indent=2)
+        os.replace(tmp_path, self.path)
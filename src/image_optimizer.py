@@ -0,0 +1,133 @@
+import asyncio
+import io
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Optional, Tuple, Union
+
+from PIL import Image, ImageOps
+
+from src.loggers import get_logger
+
+logger = get_logger(logger_name='notion2md')
+
+VALID_IMAGE_FORMATS = {'JPEG', 'PNG', 'GIF', 'JPG'}  # 업로드 가능한 포맷
+CONVERTIBLE_IMAGE_FORMATS = {'WEBP'}  # 업로드 가능한 포맷으로 변환할 포맷
+
+DEFAULT_MAX_DIMENSION = 2000  # 가로, 세로 최대 크기(px), 초과시 비율을 유지하며 축소
+DEFAULT_JPEG_QUALITY = 85
+DEFAULT_PNG_COMPRESS_LEVEL = 9
+DEFAULT_MAX_OPTIMIZE_SIZE = 20 * 1024 * 1024  # 이보다 큰 이미지는 메모리로 읽지 않고 원본 업로드 (20MB)
+
+
+def read_image_header(image: Union[str, BinaryIO]) -> Tuple[str, Tuple[int, int], bool]:
+    """
+    이미지 전체를 decode하지 않고 header에서 (포맷, (가로, 세로), 애니메이션 여부) 확인
+    """
+    with Image.open(image) as img:
+        return img.format, img.size, getattr(img, 'is_animated', False)
+
+
+def _has_alpha(img: Image.Image) -> bool:
+    return img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info)
+
+
+def optimize_image(data: bytes,
+                   max_dimension: int = DEFAULT_MAX_DIMENSION,
+                   jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+                   png_compress_level: int = DEFAULT_PNG_COMPRESS_LEVEL) -> Optional[Tuple[str, bytes]]:
+    """
+    업로드 전 이미지 최적화 (CPU 작업이므로 process pool에서 실행, 파일 대신 bytes로 주고 받음)
+        1. header로 포맷, 크기 확인 (업로드 할 수 없는 포맷은 에러)
+        2. EXIF 회전 정보를 적용하고 max_dimension보다 큰 이미지는 축소
+        3. PNG, JPEG로 다시 압축하여 가장 작은 파일 선택 (투명도가 있는 이미지는 PNG만 사용, ICC profile 유지)
+    Returns:
+        (확장자, 압축된 이미지), 원본이 가장 작은 경우 None
+    """
+    fmt, (width, height), is_animated = read_image_header(io.BytesIO(data))
+    if fmt not in VALID_IMAGE_FORMATS | CONVERTIBLE_IMAGE_FORMATS:
+        raise ValueError(f'Invalid image format: {fmt}')
+
+    # 애니메이션 GIF는 프레임 정보가 손실되므로 그대로 업로드
+    if fmt == 'GIF' and is_animated:
+        return None
+
+    needs_resize = max(width, height) > max_dimension
+    candidates = []  # (확장자, 압축된 이미지)
+    if fmt in VALID_IMAGE_FORMATS and not needs_resize:
+        candidates.append((None, data))  # 원본 유지
+
+    with Image.open(io.BytesIO(data)) as img:
+        icc_profile = img.info.get('icc_profile')
+        # 다시 압축하면 EXIF가 없어지므로 회전 정보를 픽셀에 먼저 적용
+        img = ImageOps.exif_transpose(img)
+        if needs_resize:
+            img.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+        if img.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+            if img.mode == 'CMYK':
+                icc_profile = None  # CMYK profile은 변환한 RGB 이미지에 맞지 않음
+            img = img.convert('RGBA' if _has_alpha(img) else 'RGB')
+
+        png = io.BytesIO()
+        img.save(png, 'PNG', optimize=True, compress_level=png_compress_level, icc_profile=icc_profile)
+        candidates.append(('png', png.getvalue()))
+
+        if not _has_alpha(img):
+            jpeg = io.BytesIO()
+            img.convert('RGB').save(jpeg, 'JPEG', quality=jpeg_quality, optimize=True, progressive=True,
+                                    icc_profile=icc_profile)
+            candidates.append(('jpg', jpeg.getvalue()))
+
+    ext, optimized = min(candidates, key=lambda item: len(item[1]))
+    if ext is None:
+        return None
+    return ext, optimized
+
+
+class ImageOptimizer:
+    """process pool에서 이미지 최적화를 실행 (한번의 실행 동안 pool 공유)"""
+
+    def __init__(self,
+                 max_dimension: int = DEFAULT_MAX_DIMENSION,
+                 jpeg_quality: int = DEFAULT_JPEG_QUALITY,
+                 png_compress_level: int = DEFAULT_PNG_COMPRESS_LEVEL,
+                 workers: Optional[int] = None,
+                 max_optimize_size: int = DEFAULT_MAX_OPTIMIZE_SIZE):
+        self.max_dimension = max_dimension
+        self.jpeg_quality = jpeg_quality
+        self.png_compress_level = png_compress_level
+        self.workers = workers
+        self.max_optimize_size = max_optimize_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def should_optimize(self, fmt: str, is_animated: bool, file_size: int) -> bool:
+        """
+        header 정보로 최적화할 이미지인지 확인 (False이면 원본을 읽지 않고 그대로 업로드)
+            - 애니메이션 GIF, max_optimize_size보다 큰 이미지는 원본 업로드 (변환이 필요한 포맷은 제외)
+            - 업로드 할 수 없는 포맷은 에러
+        """
+        if fmt in CONVERTIBLE_IMAGE_FORMATS:
+            return True
+        if fmt not in VALID_IMAGE_FORMATS:
+            raise ValueError(f'Invalid image format: {fmt}')
+        if fmt == 'GIF' and is_animated:
+            return False
+        return file_size <= self.max_optimize_size
+
+    async def optimize(self, data: bytes, name: str = '') -> Optional[Tuple[str, bytes]]:
+        loop = asyncio.get_running_loop()
+        optimized = await loop.run_in_executor(self.executor, optimize_image, data,
+                                               self.max_dimension, self.jpeg_quality, self.png_compress_level)
+        if optimized is not None:
+            logger.info(f'Optimized image: {name} ({len(data)} bytes) -> {optimized[0]} ({len(optimized[1])} bytes)')
+        return optimized
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,257 @@
+import re
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from src.callouts import CALLOUT_EMOJI_PATTERN, EMOJI_PATTERN, render_callout
+from src.utils import decode_url
+
+# token 종류
+TEXT = 'text'  # 일반 내용 (다음 block 전까지 여러 줄을 하나의 token으로)
+FENCE = 'fence'  # ``` 코드 블록 (info: 언어)
+MATH = 'math'  # $$ 수식 블록
+IMAGE = 'image'  # ![name](path) 줄, 인용(>) 안의 이미지 포함 (info: markdown에 쓰인 경로)
+CALLOUT = 'callout'  # <aside> callout (info: 이모지, children: 내용 token)
+
+# block이 시작되는 줄 (줄 앞의 공백 허용)
+# 이미지는 인용(>) 안에 있어도 허용 (callout으로 변환된 markdown에서도 이미지를 찾을 수 있도록)
+# <aside>는 한 줄에 있거나 같은 줄에 이모지가 이어지는 경우 (<aside>💡 내용</aside>)
+# </aside>는 줄 끝에 있으면 앞에 내용이 있어도 허용
+BLOCK_PATTERN = re.compile(rf'[ \t]*(?:(?P<fence>`{{3,}}|~{{3,}})|(?P<math>\$\$)[ \t]*$'
+                           rf'|(?P<aside><aside>)(?=[ \t]*$|[ \t]*{EMOJI_PATTERN})'
+                           rf'|(?P<aside_end></aside>)[ \t]*$|(?P<image>(?:>[ \t]*)*!\[))', re.MULTILINE)
+# block일 수 있는 위치 (줄의 첫 글자, 줄 중간의 </aside>만 확인, 앞 줄의 '\n'부터 match하여 re가 빠르게 찾아서 확인함)
+CANDIDATE_PATTERN = re.compile(r'\n[ \t]*[`~$<!>]|</aside>')
+
+Rewriter = Callable[['Token'], None]
+
+
+class Token:
+    __slots__ = ('kind', 'text', 'info', 'children')
+
+    def __init__(self, kind: str, text: str, info: Optional[str] = None, children: Optional[List['Token']] = None):
+        self.kind = kind
+        self.text = text  # 원본 내용 (token의 text를 순서대로 합치면 원본 markdown, CALLOUT은 children 사용)
+        self.info = info
+        self.children = children
+
+    def __repr__(self):
+        return f'Token({self.kind}, {len(self.text)} chars, info={self.info!r})'
+
+
+class Document:
+    """tokenize하면서 함께 수집한 문서 정보 (front matter, 이미지 업로드에 사용)"""
+    __slots__ = ('math', 'mermaid', 'images')
+
+    def __init__(self):
+        self.math = False  # 코드 블록 밖에 수식($)이 있는지
+        self.mermaid = False  # mermaid 코드 블록이 있는지
+        self.images: List[str] = []  # 업로드할 로컬 이미지 (markdown에 쓰인 경로)
+
+
+def parse_image_line(line: str) -> Tuple[str, str]:
+    """![name](path) 형태의 줄에서 (markdown에 쓰인 경로, decode된 경로) 반환"""
+    start_idx = line.find('](') + 2
+    img_rel_path_md = line[start_idx:-1]
+    return img_rel_path_md, decode_url(img_rel_path_md)
+
+
+def _find_line(text: str, literal: str, pos: int, exact: bool = True) -> Optional[Tuple[int, int]]:
+    """
+    pos 이후의 줄 중 literal만 있는 첫 줄의 (literal 시작, 줄 끝) 위치 (앞뒤 공백 허용, 줄바꿈 제외)
+    exact가 False이면 literal의 문자가 더 반복되어도 허용 (ex. ``` 코드 블록을 ```` 로 닫는 경우)
+    """
+    find = text.find
+    idx = find(literal, pos)
+    while idx != -1:
+        line_start = text.rfind('\n', 0, idx) + 1
+        line_end = find('\n', idx)
+        if line_end == -1:
+            line_end = len(text)
+        line = text[line_start:line_end].strip()
+        if line_start >= pos and (line == literal if exact else not line.strip(literal[0])):
+            return idx, line_end
+        idx = find(literal, line_end)
+    return None
+
+
+def tokenize(text: str, doc: Document, start: int = 0) -> Iterator[Token]:
+    """
+    text[start:]를 한번만 읽으면서 block token 반환 (block 사이의 내용은 줄 단위로 나누지 않고 TEXT 하나로 반환)
+    코드 블록, 수식 블록 안의 내용은 해석하지 않음 (block 줄 앞의 공백은 이전 TEXT에 포함)
+    닫히지 않은 코드 블록, 수식 블록은 여는 줄을 TEXT로 두고 다음 줄부터 계속 해석함
+
+    callout은 <aside>, </aside>를 stack으로 짝을 맞춤 (중첩, 연속된 callout 지원)
+        - callout 안의 token은 </aside>를 만날 때까지 callout의 children에 모으고, callout 밖의 token은 바로 반환
+        - 이모지로 시작하지 않는 <aside>는 변환하지 않지만 짝이 되는 </aside>까지 함께 그대로 둠
+        - 닫히지 않은 callout은 변환하지 않고 원본 그대로 반환
+    """
+    find, search, match_block = text.find, CANDIDATE_PATTERN.search, BLOCK_PATTERN.match
+    # 열린 <aside>마다 (callout token, <aside> 위치, 상위 callout의 children)
+    # callout token이 None이면 이모지가 없는 <aside>
+    stack: List[Tuple[Optional[Token], int, Optional[List[Token]]]] = []
+    out: Optional[List[Token]] = None  # 현재 위치를 감싸는 callout의 children (None이면 callout 밖)
+    # 닫는 줄을 찾지 못한 marker -> 찾기 시작한 위치 (이후 위치에서도 찾을 수 없으므로 다시 찾지 않음)
+    unclosed_from: Dict[str, int] = {}
+
+    def find_closing(marker: str, pos: int, exact: bool) -> Optional[Tuple[int, int]]:
+        if pos >= unclosed_from.get(marker, len(text) + 1):
+            return None
+        closing = _find_line(text, marker, pos, exact)
+        if closing is None:
+            unclosed_from[marker] = pos
+        return closing
+
+    pos = start
+    match = match_block(text) if start == 0 else None
+    candidate_pos = pos
+    while True:
+        while match is None:
+            candidate = search(text, candidate_pos - 1) if candidate_pos > 0 else search(text)
+            if candidate is None:
+                break
+            # 줄 첫 글자 후보는 '\n' 다음부터, </aside> 후보는 </aside> 위치부터 확인
+            candidate_start = candidate.start()
+            match = match_block(text, candidate_start + 1 if text[candidate_start] == '\n' else candidate_start)
+            candidate_pos = candidate.end()
+        if match is None:
+            break
+        kind = match.lastgroup
+        block_start = match.start(kind)
+        line_end = find('\n', block_start) + 1 or len(text)
+        next_match = None
+
+        if pos < block_start:
+            chunk = text[pos:block_start]
+            if not doc.math and '$' in chunk:
+                doc.math = True
+            if out is None:
+                yield Token(TEXT, chunk)
+            else:
+                out.append(Token(TEXT, chunk))
+
+        if kind == 'fence':
+            marker = match.group(kind)
+            closing = find_closing(marker, line_end, exact=False)
+            if closing is None:
+                block_end = line_end
+                token = Token(TEXT, text[block_start:block_end])
+            else:
+                block_end = closing[1] + 1
+                lang = text[match.end():line_end].split()
+                lang = lang[0].split('`')[0] if lang else ''
+                if lang == 'mermaid':
+                    doc.mermaid = True
+                token = Token(FENCE, text[block_start:block_end], lang)
+
+        elif kind == 'math':
+            closing = find_closing('$$', line_end, exact=True)
+            block_end = line_end if closing is None else closing[1] + 1
+            doc.math = True
+            token = Token(TEXT if closing is None else MATH, text[block_start:block_end])
+
+        elif kind == 'aside':
+            # 이모지 앞뒤의 공백을 제외한 내용부터 callout의 children (이모지는 다음 줄 또는 같은 줄)
+            emoji_match = CALLOUT_EMOJI_PATTERN.match(text, match.end(kind))
+            if emoji_match:
+                block_end = emoji_match.end()
+                token = Token(CALLOUT, '', emoji_match.group(1), [])
+                stack.append((token, block_start, out))
+                out, token = token.children, None
+                # 이모지 뒤의 내용은 줄 중간에서 시작할 수 있으므로 block인지 바로 확인
+                next_match = match_block(text, block_end)
+            else:
+                block_end = line_end
+                stack.append((None, block_start, out))
+                token = Token(TEXT, text[block_start:block_end])
+
+        elif kind == 'aside_end':
+            # callout 변환 결과는 </aside> 바로 뒤에서 이어짐
+            block_end = block_start + len('</aside>')
+            token = stack.pop() if stack else None
+            if token is not None and token[0] is not None:
+                token, _, out = token
+            else:
+                token = Token(TEXT, text[block_start:block_end])
+
+        else:
+            block_end = line_end
+            img_rel_path_md, img_rel_path = parse_image_line(text[block_start:line_end].rstrip('\n'))
+            if not img_rel_path.startswith('http'):
+                doc.images.append(img_rel_path_md)
+            token = Token(IMAGE, text[block_start:block_end], img_rel_path_md)
+
+        if token is not None:
+            if out is None:
+                yield token
+            else:
+                out.append(token)
+        pos = candidate_pos = block_end
+        match = next_match
+
+    if pos < len(text):
+        chunk = text[pos:]
+        if not doc.math and '$' in chunk:
+            doc.math = True
+        if out is None:
+            yield Token(TEXT, chunk)
+        else:
+            out.append(Token(TEXT, chunk))
+
+    # 닫히지 않은 callout은 변환하지 않고 원본 그대로 반환
+    # 안쪽 callout이 열린 뒤에는 바깥 callout에 내용이 추가되지 않으므로, 열린 순서대로
+    # <aside> 줄(이모지까지)과 내용을 이어서 가장 바깥의 닫히지 않은 callout 자리에 넣음
+    unclosed = [frame for frame in stack if frame[0] is not None]
+    if unclosed:
+        tokens: List[Token] = []
+        for callout, block_start, _ in unclosed:
+            emoji_end = CALLOUT_EMOJI_PATTERN.match(text, block_start + len('<aside>')).end()
+            tokens.append(Token(TEXT, text[block_start:emoji_end]))
+            tokens += callout.children
+        parent = unclosed[0][2]
+        if parent is None:
+            yield from tokens
+        else:
+            parent.extend(tokens)
+
+
+def scan(text: str, start: int = 0) -> Document:
+    """변환 없이 문서 정보(수식, mermaid, 이미지)만 확인"""
+    doc = Document()
+    for _ in tokenize(text, doc, start):
+        pass
+    return doc
+
+
+class MarkdownEngine:
+    """
+    markdown을 한번만 tokenize하고, 등록된 rewriter를 token 종류별로 적용하여 다시 합침
+    (ex. http -> https 변경은 TEXT, IMAGE token에만 적용하여 코드 블록은 변경하지 않음)
+    """
+
+    def __init__(self):
+        self.rewriters: Dict[str, List[Rewriter]] = {}
+
+    def register(self, kinds: Union[str, Iterable[str]], rewriter: Rewriter) -> None:
+        """rewriter(token)는 token.text를 직접 변경 (등록한 순서대로 실행)"""
+        for kind in ([kinds] if isinstance(kinds, str) else kinds):
+            self.rewriters.setdefault(kind, []).append(rewriter)
+
+    def render(self, text: str, start: int = 0) -> Tuple[str, Document]:
+        """text[start:]를 변환하여 (변환된 markdown, 문서 정보) 반환"""
+        doc = Document()
+        out: List[str] = []
+        self._render(tokenize(text, doc, start), out)
+        return ''.join(out), doc
+
+    def _render(self, tokens: Iterable[Token], out: List[str]) -> None:
+        rewriters = self.rewriters
+        for token in tokens:
+            if token.kind in rewriters:
+                for rewriter in rewriters[token.kind]:
+                    rewriter(token)
+            if token.kind == CALLOUT:
+                content: List[str] = []
+                self._render(token.children, content)
+                # 내용 끝의 공백, 빈 줄은 제거
+                out.append(render_callout(token.info, ''.join(content).rstrip()))
+            else:
+                out.append(token.text)
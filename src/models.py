@@ -1,8 +1,10 @@
-from typing import List, Optional
-import yaml
+from pathlib import Path
+from typing import Any, List, Optional
 
 from pydantic import BaseModel
 
+from src.front_matter_yaml import dump_front_matter
+
 
 class PageInfo(BaseModel):
     name: str
@@ -13,6 +15,21 @@ class PageInfo(BaseModel):
 class MDInfo(BaseModel):
     filename: str  # YYYY-MM-DD-UID.md
     content: str  # markdown content
+    images: List[str] = []  # 업로드할 로컬 이미지 (markdown에 쓰인 경로)
+    date: Optional[str] = None  # front matter의 date (2024-09-21 00:00:00 +0900)
+
+
+class PageJob(BaseModel):
+    """pipeline의 stage 사이에서 전달되는 page 처리 상태"""
+    index: int  # 처리 순서 (1부터 시작)
+    page: PageInfo
+    workspace: Optional[str] = None  # 페이지별 작업 폴더
+    export_fp: Optional[Any] = None  # 다운로드된 export zip 파일 경로 (또는 메모리 buffer)
+    archive: Optional[Any] = None  # export 결과를 읽는 ExportArchive (압축 해제된 폴더 또는 zip)
+    md_path: Optional[str] = None  # export된 markdown 파일 경로
+    md: Optional[MDInfo] = None  # 변환된 markdown
+    save_fp: Optional[Path] = None  # 저장된 markdown 파일 경로
+    error: Optional[Any] = None  # export 중 발생한 에러 (Exception)
 
 
 class FrontMatter(BaseModel):
@@ -28,13 +45,13 @@ class FrontMatter(BaseModel):
     mermaid: Optional[bool] = False
 
     def to_md(self):
-        _dict = self.dict()
+        _dict = {'title': self.title, 'categories': self.categories, 'tags': self.tags, 'date': self.date,
+                 'uid': self.uid}
 
-        # remove math, mermaid if False
-        if not _dict['math']:
-            _dict.pop('math')
-        if not _dict['mermaid']:
-            _dict.pop('mermaid')
+        # add math, mermaid if True (False이면 생략)
+        if self.math:
+            _dict['math'] = self.math
+        if self.mermaid:
+            _dict['mermaid'] = self.mermaid
 
-        _yaml = yaml.dump(_dict, default_flow_style=False, allow_unicode=True)
-        return f"---\n{_yaml}---"
+        return f"---\n{dump_front_matter(_dict)}---"
@@ -1,11 +1,50 @@
+import time
 from pprint import pprint
-from typing import Optional
+from typing import Callable, Iterator, Optional
 from notion_client import Client
+from notion_client.errors import HTTPResponseError, RequestTimeoutError
+
+from src.loggers import get_logger
+from src.rate_limit import get_rate_limiter
+from src.retry import DEFAULT_MAX_RETRIES, MAX_RETRY_WAIT, backoff_delay, retry_after_delay, should_retry
+
+logger = get_logger(logger_name='notion2md')
 
 
 class NotionAPI:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, max_retries: int = DEFAULT_MAX_RETRIES):
         self.client = Client(auth=api_key)
+        self.max_retries = max_retries
+
+    def _call(self, func: Callable, idempotent: bool = True, **kwargs):
+        """
+        notion api 요청 (모든 요청이 'notion' rate limiter를 공유)
+        rate limit(429) 응답은 Retry-After만큼 기다린 후 재시도, 5xx와 timeout은 idempotent한 요청만 재시도
+        """
+        limiter = get_rate_limiter('notion')
+        for attempt in range(self.max_retries + 1):
+            limiter.acquire_blocking()
+            try:
+                return func(**kwargs)
+            except (HTTPResponseError, RequestTimeoutError) as e:
+                if attempt == self.max_retries:
+                    raise
+                status, headers = getattr(e, 'status', None), getattr(e, 'headers', None) or {}
+                delay = retry_after_delay(headers)
+                if delay is not None:
+                    limiter.pause(min(delay, MAX_RETRY_WAIT))
+
+                if status is None:
+                    retry = idempotent  # timeout
+                else:
+                    retry = should_retry(status, headers, idempotent)
+                if delay is None:
+                    delay = backoff_delay(attempt)
+                if not retry or delay > MAX_RETRY_WAIT:
+                    raise
+                logger.warning(f'[notion] request failed ({status or "timeout"}), retry in {delay:.1f}s '
+                               f'({attempt + 1}/{self.max_retries})')
+                time.sleep(delay)
 
     def page_name_to_id(self, database_id: str, name: str, property: str) -> Optional[str]:
         """
@@ -53,10 +92,38 @@ class NotionAPI:
         if filters:
             query["filter"] = filters
 
-        return self.client.databases.query(**query)
+        return self._call(self.client.databases.query, **query)
+
+    def iter_pages(self, database_id: str, filters: Optional[dict] = None, page_size: int = 100) -> Iterator[dict]:
+        """
+        Get all pages from database (has_more인 경우 next_cursor로 다음 요청을 보냄).
+        다음 요청은 이전 결과를 모두 사용한 뒤에 보내므로, 첫번째 결과부터 바로 처리할 수 있음
+
+        Args:
+            database_id: database id
+            filters:
+            page_size: 요청 한번에 가져올 page 수 (최대 100)
+
+        Returns:
+            page: page 한개씩 반환
+        """
+        query = {
+            "database_id": database_id,
+            "page_size": page_size,
+        }
+        if filters:
+            query["filter"] = filters
+
+        while True:
+            resp = self._call(self.client.databases.query, **query)
+            yield from resp["results"]
+
+            if not resp.get("has_more") or not resp.get("next_cursor"):
+                return
+            query["start_cursor"] = resp["next_cursor"]
 
     def get_page(self, page_id: str) -> dict:
-        return self.client.pages.retrieve(**{"page_id": page_id})
+        return self._call(self.client.pages.retrieve, **{"page_id": page_id})
 
     def update(self, page_id: str, properties: dict):
         """
@@ -67,7 +134,8 @@ class NotionAPI:
                 e.g. checkbox의 경우: {"컬럼명": {"checkbox": True}}
         """
 
-        return self.client.pages.update(
+        return self._call(
+            self.client.pages.update,
             **{
                 "page_id": page_id,
                 "properties": properties,
@@ -87,7 +155,9 @@ class NotionAPI:
             properties = {}
         properties = self._prop_dict_to_notion(properties)
 
-        resp = self.client.pages.create(
+        resp = self._call(
+            self.client.pages.create,
+            idempotent=False,
             **{
                 "parent": {"database_id": database_id},
                 "properties": properties,
@@ -101,7 +171,8 @@ class NotionAPI:
         Args:
             page_id: page id to remove
         """
-        return self.client.pages.update(
+        return self._call(
+            self.client.pages.update,
             **{
                 "page_id": page_id,
                 "archived": True,
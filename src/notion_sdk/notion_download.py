@@ -1,67 +1,65 @@
-import os
+import asyncio
+from typing import AsyncIterator, Iterator
 
 from easydict import EasyDict
 
 from src.models import PageInfo
 from src.notion_sdk.notion_api import NotionAPI
-from src.notion_sdk.notion_exporter import NotionBackUpClient
-from src.utils import unzip_all, find_md_file, expanduser
+from src.utils import unzip_all, find_md_file
 
 from src.loggers import get_logger
 
 logger = get_logger(logger_name='notion2md')
 
 
-def get_posting_pages(config: EasyDict) -> [PageInfo]:
+def iter_posting_pages(config: EasyDict) -> Iterator[PageInfo]:
+    """
+    발행 요청 상태의 page를 MAX_PAGE_SIZE 단위로 조회하여 하나씩 반환 (next_cursor를 따라 모든 page 조회)
+    """
     # notion client
     notion = NotionAPI(api_key=config.NOTION.API_KEY)
 
     # get pages
-    pages = notion.get_pages(database_id=config.NOTION.DATABASE_ID,
-                             filters={
-                                 "property": config.NOTION.COLUMN.STATUS.NAME,
-                                 "select": {
-                                     "equals": config.NOTION.COLUMN.STATUS.POSTING
-                                 }
-                             },
-                             page_size=config.NOTION.MAX_PAGE_SIZE)
+    pages = notion.iter_pages(database_id=config.NOTION.DATABASE_ID,
+                              filters={
+                                  "property": config.NOTION.COLUMN.STATUS.NAME,
+                                  "select": {
+                                      "equals": config.NOTION.COLUMN.STATUS.POSTING
+                                  }
+                              },
+                              page_size=config.NOTION.MAX_PAGE_SIZE)
 
     main_column = config.NOTION.COLUMN.MAIN.NAME
     uid_column = config.NOTION.COLUMN.UID.NAME
 
-    pages = [
-        PageInfo(name=page['properties'][main_column]['title'][0]['plain_text'],
-                 id=page['id'],
-                 uid=page['properties'][uid_column]['unique_id']['number'])
-        for page in pages['results']
-    ]
-
     logger.info("Pages to export:")
     for i, page in enumerate(pages, start=1):
-        logger.info(f'\t[{i:02}] Page Name: {page.name}, Page ID: {page.id}')
-
-    return pages
-
-
-def export_notion_data(notion_token_v2: str, download_dir: str, page: PageInfo) -> str:
-    # get notion exporter client
-    notion_exporter = NotionBackUpClient(notion_token_v2,
-                                         download_path=download_dir)
-
-    # check if there are files in download path
-    exist_file_list = os.listdir(expanduser(download_dir))
-    if '.DS_Store' in exist_file_list:
-        exist_file_list.remove('.DS_Store')
-    if len(exist_file_list) > 0:
-        logger.warning(f'Files already exist in {download_dir}. Please remove them before exporting')
-        raise ValueError(f'Files already exist in {download_dir}. Please remove them before exporting')
-
-    # export notion data
-    notion_exporter.export(page_id=page.id, exportType='markdown')
-
+        page = PageInfo(name=page['properties'][main_column]['title'][0]['plain_text'],
+                        id=page['id'],
+                        uid=page['properties'][uid_column]['unique_id']['number'])
+        logger.info(f'\t[{i:02}] Page to export: {page.name}, Page ID: {page.id}')
+        yield page
+
+
+async def stream_posting_pages(config: EasyDict) -> AsyncIterator[PageInfo]:
+    """
+    iter_posting_pages를 thread에서 실행하여 event loop를 막지 않고 page를 하나씩 반환
+    """
+    pages = iter_posting_pages(config)
+    while True:
+        page = await asyncio.to_thread(next, pages, None)
+        if page is None:
+            return
+        yield page
+
+
+def extract_notion_data(workspace: str, page: PageInfo) -> str:
+    """
+    workspace에 다운로드된 export zip 파일을 압축 해제 후 md 파일 경로 반환
+    """
     # unzip exported data and remove
-    unzip_all(download_dir, remove_zip=True)
-    md_file_path = find_md_file(download_dir, extension='md')
+    unzip_all(workspace, remove_zip=True)
+    md_file_path = find_md_file(workspace, extension='md')
 
     logger.info(f'Exported {page.name} markdown file: {md_file_path}')
     return md_file_path
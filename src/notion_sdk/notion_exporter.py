@@ -1,45 +1,123 @@
+import asyncio
+import contextlib
+import random
+import tempfile
+import time
+import aiohttp
 from notion.client import NotionClient
-import requests
-from tqdm import tqdm
-from time import sleep
 from pathlib import Path
+from typing import AsyncIterable, AsyncIterator, BinaryIO, Dict, List, Optional, Tuple, Union
 import os
+from src.concurrency import get_concurrency_limiter
+from src.downloader import Downloader, verify_zip
+from src.http_client import get_http_client
 from src.loggers import get_logger
+from src.notion_sdk.notion_session import NotionSessionCache
+from src.retry import RETRY_STATUSES
 
 NOTION_API_ROOT = "https://www.notion.so/api/v3"
-BLOCK_SIZE = 1024  # download 1KB
+EXPORT_TASK_SERVICE = 'notion_export_task'  # 동시에 진행하는 export task 수를 조절하는 concurrency limiter
+POLL_INITIAL_INTERVAL = 0.5  # export task 상태 확인 주기(초), 처음에는 짧게 확인
+POLL_MAX_INTERVAL = 8  # 최대 확인 주기(초)
+POLL_BACKOFF = 2  # 확인할 때마다 주기를 늘리는 비율
+DEFAULT_EXPORT_DEADLINE = 300  # page별 export 최대 대기 시간(초)
+DEFAULT_DOWNLOAD_BUFFER = 4  # 다운로드 중이거나 전달을 기다리는 export zip 최대 개수
+_POLL_FAILED = object()  # task 상태 확인이 예외로 종료되었다는 신호
 
 logger = get_logger(logger_name='notion2md')
 
 
+class ExportError(Exception):
+    def __init__(self, page_id: str, message: str):
+        self.page_id = page_id
+        super().__init__(f'[Export Error] {message} (page id: {page_id})')
+
+
+class ExportTimeoutError(ExportError):
+    def __init__(self, page_id: str, deadline: float):
+        self.deadline = deadline
+        super().__init__(page_id, f'export가 {deadline}초 안에 완료되지 않았습니다')
+
+
+@contextlib.contextmanager
+def _open_for_write(export_file: Union[Path, BinaryIO]):
+    """경로는 파일을 열어서 반환하고, 파일 객체는 닫지 않고 그대로 반환"""
+    if isinstance(export_file, (str, Path)):
+        # 이어받기, 나눠받기, 압축 확인을 위해 읽기/쓰기 모드로 열기
+        with Path(export_file).open('w+b') as f:
+            yield f
+    else:
+        yield export_file
+
+
+def _poll_intervals(initial: float = POLL_INITIAL_INTERVAL,
+                    maximum: float = POLL_MAX_INTERVAL,
+                    backoff: float = POLL_BACKOFF):
+    """exponential backoff + jitter (다음 확인까지 대기할 시간)"""
+    interval = initial
+    while True:
+        yield interval * random.uniform(0.5, 1.0)
+        interval = min(interval * backoff, maximum)
+
+
 class NotionBackUpClient:
-    def __init__(self, token, download_path='~/.notion2md'):
+    def __init__(self, token, download_path='~/.notion2md', downloader: Optional[Downloader] = None,
+                 verify: bool = True, session_cache: Optional[NotionSessionCache] = None):
+        """
+        한번의 실행 동안 하나의 client를 공유하여 사용 (space id, file token 조회는 생성시 한번만 수행)
+        Args:
+            token: notion token_v2
+            download_path: export 파일을 저장할 폴더
+            downloader: export zip 다운로드 설정 (chunk 크기, 이어받기, 나눠받기)
+            verify: 다운로드한 zip 파일의 손상 여부 확인
+            session_cache: 이전 실행에서 조회한 space id, file token (있으면 NotionClient 초기화 생략)
+        """
         self.token = token
-        self.space_id = NotionClient(token).current_space.id
+        self.downloader = downloader or Downloader()
+        self.verify = verify
+        self.session_cache = session_cache
         self.download_path = Path(download_path)
 
+        cached = session_cache.get(token) if session_cache is not None else None
+        if cached is not None:
+            self.space_id, self.file_token = cached
+            logger.info('Using cached notion session (space id, file token)')
+        else:
+            self.space_id, self.file_token = self._bootstrap(token)
+            if session_cache is not None:
+                session_cache.set(token, self.space_id, self.file_token)
+
+        # 다운로드 폴더 생성
+        os.makedirs(os.path.expanduser(download_path), exist_ok=True)
+
+    @staticmethod
+    def _bootstrap(token) -> Tuple[str, str]:
+        """NotionClient로 (space id, file token) 조회"""
+        client = NotionClient(token)
+        space_id = client.current_space.id
+
         # get filetoken
         try:
-            self.file_token = NotionClient(token).session.cookies.get('file_token')
+            file_token = client.session.cookies.get('file_token')
         except Exception as e:
             print(e)
             raise ValueError('[Error] file token값이 올바르지 않습니다. 다시 확인 해 주세요. [{}]'.format(token))
+        return space_id, file_token
 
-        # 다운로드 폴더 생성
-        os.makedirs(os.path.expanduser(download_path), exist_ok=True)
-
-    def _send_post_request(self, path, body):
-        response = requests.request(
-            "POST",
+    async def _send_post_request(self, path, body, idempotent=False):
+        # idempotent하지 않은 요청(task 등록)은 rate limit 응답인 경우에만 재시도
+        response = await get_http_client().post(
             f"{NOTION_API_ROOT}/{path}",
+            service="notion_export",
+            idempotent=idempotent,
             json=body,
             cookies={"token_v2": self.token},
         )
         response.raise_for_status()
         return response.json()
 
-    def launch_export_task(self, page_id, exportType):
-        return self._send_post_request(
+    async def launch_export_task(self, page_id, exportType):
+        return (await self._send_post_request(
             "enqueueTask",
             {
                 "task": {
@@ -58,53 +136,273 @@ class NotionBackUpClient:
                     },
                 }
             },
-        )["taskId"]
+        ))["taskId"]
 
-    def get_user_task_status(self, task_id):
-        task_statuses = self._send_post_request("getTasks", {"taskIds": [task_id]})[
-            "results"
-        ]
+    async def get_user_task_statuses(self, task_ids: List[str]) -> Dict[str, dict]:
+        """여러 task의 상태를 한번의 getTasks 요청으로 조회"""
+        task_statuses = (await self._send_post_request("getTasks", {"taskIds": task_ids}, idempotent=True))["results"]
+        return {task_status["id"]: task_status for task_status in task_statuses}
 
-        return list(
-            filter(lambda task_status: task_status["id"] == task_id, task_statuses)
-        )[0]
-
-    def download_file(self, url, export_file):
+    async def download_file(self, url, export_file: Union[Path, BinaryIO]):
+        """
+        export zip 다운로드 후 손상 여부 확인 (export_file이 파일 객체인 경우 파일 객체에 씀)
+        """
         cookies = {'file_token': self.file_token}
-        with requests.get(url, stream=True, allow_redirects=True, cookies=cookies) as response:
-            total_size = int(response.headers.get("content-length", 0))
-            tqdm_bar = tqdm(total=total_size, unit="iB", unit_scale=True)
-            with export_file.open("wb") as export_file_handle:
-                for data in response.iter_content(BLOCK_SIZE):
-                    tqdm_bar.update(len(data))
-                    export_file_handle.write(data)
-            tqdm_bar.close()
+        with _open_for_write(export_file) as export_file_handle:
+            try:
+                size = await self.downloader.download(url, export_file_handle, cookies=cookies)
+            except aiohttp.ClientResponseError as e:
+                # file token이 만료된 경우 다음 실행에서 다시 조회
+                if e.status in (401, 403) and self.session_cache is not None:
+                    self.session_cache.invalidate(self.token)
+                raise
+            if self.verify:
+                export_file_handle.seek(0)
+                await asyncio.to_thread(verify_zip, export_file_handle)
+        logger.info(f'Downloaded export ({size} bytes)')
 
-    def export(self, page_id, exportType):
+    async def export(self, page_id, exportType, deadline: float = DEFAULT_EXPORT_DEADLINE,
+                     download_path: Optional[Union[str, Path]] = None):
+        """page 하나를 export (download_path가 없으면 client의 download_path에 저장)"""
+        save_dir = download_path or self.download_path
+        async for _, save_fp, error in self.export_many({page_id: save_dir}, exportType, deadline):
+            if error is not None:
+                raise error
+            return save_fp
 
-        task_id = self.launch_export_task(page_id=page_id, exportType=exportType)
+    async def export_many(self,
+                          download_dirs: Union[Dict[str, Union[str, Path]], AsyncIterable[Tuple[str, Union[str, Path]]]],
+                          exportType,
+                          deadline: float = DEFAULT_EXPORT_DEADLINE,
+                          spool_max_size: Optional[int] = None,
+                          download_buffer: int = DEFAULT_DOWNLOAD_BUFFER
+                          ) -> AsyncIterator[Tuple[str, Optional[Union[Path, BinaryIO]], Optional[Exception]]]:
+        """
+        여러 page의 export task를 한번에 등록하고, 모든 task의 상태를 한번의 getTasks 요청으로 확인
+        task가 완료되는 즉시 zip 파일을 다운로드하며, 다운로드가 끝난 순서대로 반환
+        Args:
+            download_dirs: {page id: zip 파일을 저장할 폴더}
+                           또는 (page id, 폴더)를 반환하는 async iterable (page가 전달되는 즉시 task 등록)
+            exportType: 'markdown', 'html' 등
+            deadline: page별 export 최대 대기 시간(초), 초과시 ExportTimeoutError
+                      (export된 page 수가 늘어나면 그 시각부터 다시 계산)
+            spool_max_size: 지정한 경우 zip을 파일 대신 메모리 buffer(SpooledTemporaryFile)로 다운로드
+                            (spool_max_size byte를 넘으면 임시 파일로 옮겨짐)
+            download_buffer: 다운로드 중이거나 다운로드가 끝났지만 아직 가져가지 않은 zip 최대 개수
+                             (가져가는 속도보다 export가 빠르면 다운로드를 시작하지 않고 대기)
+        Returns:
+            (page id, 저장된 zip 파일 경로 또는 buffer, error) - 실패한 경우 경로는 None
+        """
+        results = asyncio.Queue()
+        save_dirs = {}  # page id -> zip 파일을 저장할 폴더
+        pending = {}  # task id -> page id
+        launched_at = {}  # task id -> 등록 시각 (export가 진행되면 마지막으로 진행된 시각)
+        finished = {}  # task id -> export가 끝나면 결과를 받을 future (과부하 이유, 정상 종료는 None)
+        export_limiter = get_concurrency_limiter(EXPORT_TASK_SERVICE)
+        new_task = asyncio.Event()
+        feed_done = False
+        launches = set()
+        downloads = set()
+        # 다운로드 slot은 다운로드한 zip을 가져갈 때 반환 (다운로드가 실패한 경우 바로 반환)
+        download_slots = asyncio.Semaphore(max(1, download_buffer))
 
-        for i in range(5):
-            task_status = self.get_user_task_status(task_id)
+        async def _download(page_id, export_link):
+            # 가져가지 않은 zip이 download_buffer개면 가져갈 때까지 다운로드를 시작하지 않음
+            await download_slots.acquire()
+            if spool_max_size is not None:
+                save_fp = tempfile.SpooledTemporaryFile(max_size=spool_max_size, suffix=f'-{page_id}.zip')
+            else:
+                save_fp = Path(save_dirs[page_id]).expanduser() / f'Export-{page_id}.zip'
+            try:
+                await self.download_file(export_link, save_fp)
+            except Exception as e:
+                download_slots.release()
+                if spool_max_size is not None:
+                    save_fp.close()
+                results.put_nowait((page_id, None, e))
+                return
 
-            if task_status["state"] == "success":
-                break
+            if spool_max_size is not None:
+                size = save_fp.tell()
+                save_fp.seek(0)
+                logger.info(f'Exported {page_id} to buffer ({size} bytes, '
+                            f'{"in memory" if size <= spool_max_size else "spilled to temp file"})')
+            else:
+                logger.info(f'Exported {page_id} to {save_fp}')
+            results.put_nowait((page_id, save_fp, None))
 
-            print('Export still in progress...')
-            sleep(5)
-        else:
-            print('Export Error.')
-            return
+        async def _launch(page_id):
+            # notion에서 동시에 진행하는 export 수는 AIMD로 조절 (slot은 export가 끝날 때까지 차지)
+            async with (export_limiter.slot() if export_limiter is not None else contextlib.nullcontext()) as slot:
+                try:
+                    task_id = await self.launch_export_task(page_id=page_id, exportType=exportType)
+                except Exception as e:
+                    if slot is not None and isinstance(e, aiohttp.ClientResponseError) \
+                            and (e.status == 429 or e.status in RETRY_STATUSES):
+                        slot.overload(f'status {e.status}')
+                    results.put_nowait((page_id, None, e))
+                    return
+                finished[task_id] = asyncio.get_running_loop().create_future()
+                pending[task_id] = page_id
+                launched_at[task_id] = time.monotonic()
+                new_task.set()
+
+                overload = await finished[task_id]
+                if slot is not None:
+                    # export 시간은 page 크기에 따라 다르므로 실패, timeout만 과부하로 판단
+                    if overload is None:
+                        slot.success(check_latency=False)
+                    else:
+                        slot.overload(overload)
+
+        def _finish(task_id, overload=None):
+            """pending에서 task를 제거하고 export slot 반환, page id 반환"""
+            done = finished.pop(task_id, None)
+            if done is not None and not done.done():
+                done.set_result(overload)
+            return pending.pop(task_id)
+
+        async def _feed():
+            # page가 전달되는 즉시 export task 등록
+            nonlocal feed_done
+            try:
+                async for page_id, save_dir in _iter_download_dirs(download_dirs):
+                    save_dirs[page_id] = save_dir
+                    task = asyncio.create_task(_launch(page_id))
+                    launches.add(task)
+                    task.add_done_callback(launches.discard)
+            finally:
+                # page 목록 조회가 실패해도 이미 등록 중인 task가 pending에 들어간 뒤에 상태 확인을 끝냄
+                await asyncio.gather(*launches, return_exceptions=True)
+                feed_done = True
+                new_task.set()
+                results.put_nowait(None)  # 전달된 page 수를 확정하기 위한 신호
+
+        async def _poll():
+            progress = {}  # task id -> 지금까지 export된 page 수
+            intervals = {}  # task id -> 확인 주기 (task마다 따로 backoff)
+            next_poll_at = {}  # task id -> 다음 확인 시각
+            while True:
+                if not pending:
+                    if feed_done:
+                        return
+                    # 새로운 task가 등록될 때까지 대기
+                    new_task.clear()
+                    await new_task.wait()
+                    continue
+
+                # 새로 등록된 task는 짧은 주기부터 확인
+                now = time.monotonic()
+                for task_id in pending:
+                    if task_id not in intervals:
+                        intervals[task_id] = _poll_intervals()
+                        next_poll_at[task_id] = now + next(intervals[task_id])
+
+                due = [task_id for task_id in pending if next_poll_at[task_id] <= now]
+                if due:
+                    try:
+                        task_statuses = await self.get_user_task_statuses(due)
+                    except Exception as e:
+                        for task_id in due:
+                            results.put_nowait((_finish(task_id, f'getTasks failed ({e!r})'), None, e))
+                        continue
+
+                    now = time.monotonic()
+                    for task_id in due:
+                        task_status = task_statuses.get(task_id) or {}
+                        page_id = pending[task_id]
+                        state = task_status.get("state")
+                        status = task_status.get("status") or {}
+
+                        if state == "success" and not status.get("exportURL"):
+                            _finish(task_id)
+                            results.put_nowait((page_id, None, ExportError(page_id, 'export가 완료되었지만 exportURL이 없습니다')))
+                        elif state == "success":
+                            _finish(task_id)
+                            task = asyncio.create_task(_download(page_id, status["exportURL"]))
+                            downloads.add(task)
+                            task.add_done_callback(downloads.discard)
+                        elif state == "failure":
+                            _finish(task_id, 'export failure')
+                            results.put_nowait((page_id, None, ExportError(page_id, str(task_status.get("error")))))
+                        elif status.get("pagesExported") is not None and status["pagesExported"] != progress.get(task_id):
+                            # 진행 중이면 deadline을 다시 계산하고 짧은 주기로 확인
+                            progress[task_id] = status["pagesExported"]
+                            launched_at[task_id] = now
+                            intervals[task_id] = _poll_intervals()
+                            logger.info(f'Export in progress: {page_id} ({status["pagesExported"]} pages exported)')
+                        if task_id in pending:
+                            next_poll_at[task_id] = now + next(intervals[task_id])
+
+                # 상태 응답에 없는 task도 deadline 확인
+                for task_id in [task_id for task_id in pending if now - launched_at[task_id] > deadline]:
+                    page_id = _finish(task_id, 'export timeout')
+                    results.put_nowait((page_id, None, ExportTimeoutError(page_id, deadline)))
+
+                if pending:
+                    # 가장 먼저 확인할 task까지 대기 (새로운 task가 등록되면 다시 계산)
+                    # 상태 확인 중에 등록된 task는 아직 확인 시각이 없으므로 바로 다시 계산
+                    new_task.clear()
+                    now = time.monotonic()
+                    timeout = max(0.0, min(next_poll_at.get(task_id, now) for task_id in pending) - now)
+                    with contextlib.suppress(asyncio.TimeoutError):
+                        await asyncio.wait_for(new_task.wait(), timeout)
+
+        def _on_poll_done(task):
+            # 상태 확인이 예외로 종료되면 남은 page의 결과가 오지 않으므로 generator에 알림
+            if not task.cancelled() and task.exception() is not None:
+                results.put_nowait(_POLL_FAILED)
+
+        feeder = asyncio.create_task(_feed())
+        poller = asyncio.create_task(_poll())
+        poller.add_done_callback(_on_poll_done)
+        reported = set()
+        fed_all = False
+        try:
+            while not (fed_all and len(reported) == len(save_dirs)):
+                result = await results.get()
+                if result is None:
+                    fed_all = True
+                    continue
+                if result is _POLL_FAILED:
+                    # 이미 나온 결과는 전달하고, 결과가 나오지 않은 page는 모두 실패 처리하고 종료
+                    error = poller.exception()
+                    logger.error(f'Export polling failed: {error}')
+                    while not results.empty():
+                        result = results.get_nowait()
+                        if result is not None:
+                            if result[1] is not None:
+                                download_slots.release()
+                            reported.add(result[0])
+                            yield result
+                    for page_id in [page_id for page_id in save_dirs if page_id not in reported]:
+                        reported.add(page_id)
+                        yield page_id, None, error
+                    return
+                if result[1] is not None:
+                    download_slots.release()
+                reported.add(result[0])
+                yield result
+
+            # page 목록 조회 중 발생한 에러 전달
+            await feeder
+        finally:
+            # 중간에 종료된 경우 남은 작업 취소
+            for task in [feeder, poller, *launches, *downloads]:
+                task.cancel()
 
-        # download file
-        export_link = task_status["status"]["exportURL"]
-        save_fp = self.download_path.expanduser() / f'Export-{page_id}.zip'
-        self.download_file(export_link, save_fp)
 
-        logger.info(f'Exported {page_id} to {save_fp}')
+async def _iter_download_dirs(download_dirs) -> AsyncIterator[Tuple[str, Union[str, Path]]]:
+    if isinstance(download_dirs, dict):
+        for item in download_dirs.items():
+            yield item
+    else:
+        async for item in download_dirs:
+            yield item
 
 
 if __name__ == '__main__':
+    from src.http_client import run
     from src.utils import get_config
 
     config = get_config()
@@ -113,4 +411,4 @@ if __name__ == '__main__':
     ne = NotionBackUpClient(token=config.NOTION_API_TOKEN_V2, download_path='~/.n2t')
     page_id = " <page id> "
     exportType = 'markdown'
-    ne.export(page_id=page_id, exportType=exportType)
+    run(ne.export(page_id=page_id, exportType=exportType))
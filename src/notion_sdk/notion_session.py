@@ -0,0 +1,62 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from src.loggers import get_logger
+from src.utils import expanduser
+
+logger = get_logger(logger_name='notion2md')
+
+DEFAULT_SESSION_TTL = 12 * 60 * 60  # 저장한 session 정보를 사용하는 시간(초)
+
+
+def _token_key(token: str) -> str:
+    # token_v2를 파일에 그대로 저장하지 않도록 hash를 key로 사용
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+class NotionSessionCache:
+    """
+    token_v2별 space_id, file_token을 파일에 저장 (다음 실행에서 NotionClient 초기화 요청 생략)
+    ttl이 지난 정보는 사용하지 않음
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_SESSION_TTL):
+        self.path = expanduser(path)
+        self.ttl = ttl
+        self.sessions: Dict[str, dict] = {}
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.sessions = json.load(f)
+            except Exception as e:
+                logger.warning(f'Failed to read notion session cache, starting from empty cache: {self.path} ({e})')
+
+    def get(self, token: str) -> Optional[Tuple[str, str]]:
+        """저장된 (space_id, file_token), 없거나 만료된 경우 None"""
+        session = self.sessions.get(_token_key(token))
+        if session is None or time.time() - session['created_at'] > self.ttl:
+            return None
+        return session['space_id'], session['file_token']
+
+    def set(self, token: str, space_id: str, file_token: str) -> None:
+        self.sessions[_token_key(token)] = {'space_id': space_id, 'file_token': file_token,
+                                            'created_at': time.time()}
+        self.save()
+
+    def invalidate(self, token: str) -> None:
+        """file_token이 만료된 경우 등 (다음 실행에서 다시 초기화)"""
+        if self.sessions.pop(_token_key(token), None) is not None:
+            self.save()
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        # 저장 중 중단되어도 기존 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체 (file_token이 있으므로 본인만 읽기 가능)
+        tmp_path = f'{self.path}.tmp'
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w', encoding='utf-8') as f:
+            json.dump(self.sessions, f, indent=2)
+        os.replace(tmp_path, self.path)
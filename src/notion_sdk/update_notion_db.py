@@ -1,16 +1,36 @@
+import asyncio
+from typing import Optional
+
 from easydict import EasyDict
 
 from src.models import PageInfo
 from src.notion_sdk.notion_api import NotionAPI
 
 
-def update_notion_db(config: EasyDict, page: PageInfo):
+def update_notion_db(config: EasyDict, page: PageInfo) -> dict:
     client = NotionAPI(api_key=config.NOTION.API_KEY)  # notion api 사이트에서 발급받기
 
     # update status column
     col_status = config.NOTION.COLUMN.STATUS.NAME
     val_posted = config.NOTION.COLUMN.STATUS.POSTED
-    client.update(page_id=page.id, properties={col_status: {"select": {"name": val_posted}}})
+    return client.update(page_id=page.id, properties={col_status: {"select": {"name": val_posted}}})
+
+
+class NotionStatusUpdater:
+    """
+    page 상태를 발행 완료로 변경 (한번의 실행 동안 하나의 client 공유)
+    여러 page의 요청을 동시에 보내며, 요청 속도는 NotionAPI가 공유하는 'notion' rate limiter로 조절
+    """
+
+    def __init__(self, config: EasyDict, client: Optional[NotionAPI] = None):
+        self.client = client or NotionAPI(api_key=config.NOTION.API_KEY)
+        self.col_status = config.NOTION.COLUMN.STATUS.NAME
+        self.val_posted = config.NOTION.COLUMN.STATUS.POSTED
+
+    async def update(self, page: PageInfo) -> dict:
+        """page 상태 변경 후 변경된 page 반환"""
+        return await asyncio.to_thread(self.client.update, page_id=page.id,
+                                       properties={self.col_status: {"select": {"name": self.val_posted}}})
 
 
 if __name__ == '__main__':
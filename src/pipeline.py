@@ -0,0 +1,174 @@
+import asyncio
+import inspect
+import time
+from typing import Any, AsyncIterable, Callable, Iterable, List, Optional, Union
+
+from src.loggers import get_logger
+
+logger = get_logger(logger_name='notion2md')
+
+_STOP = object()  # stage 종료 신호
+
+
+class StageStats:
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.failed = 0
+        self.busy_time = 0.0  # 모든 worker가 작업에 사용한 시간의 합
+        self.first_start = None
+        self.last_end = None
+
+    @property
+    def elapsed(self) -> float:
+        if self.first_start is None or self.last_end is None:
+            return 0.0
+        return self.last_end - self.first_start
+
+    @property
+    def throughput(self) -> float:
+        """초당 처리한 item 수"""
+        return self.processed / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __str__(self):
+        return (f'{self.name}: {self.processed} done, {self.failed} failed, '
+                f'{self.throughput:.2f} items/s (workers: {self.workers}, busy: {self.busy_time:.1f}s)')
+
+
+class Stage:
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1, queue_size: int = 1):
+        """
+        Args:
+            name: stage 이름 (report에 사용)
+            func: item을 받아 다음 stage로 넘길 item을 반환하는 함수
+                  (coroutine 함수는 event loop에서, 일반 함수는 thread에서 실행)
+            workers: stage의 worker 수
+            queue_size: stage 입력 queue의 최대 크기 (queue가 가득 차면 이전 stage가 대기함)
+        """
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.queue_size = max(1, queue_size)
+        self.stats = StageStats(name, self.workers)
+
+        self.queue: Optional[asyncio.Queue] = None  # event loop 안에서 생성
+        self._alive_workers = self.workers
+        self._is_async = inspect.iscoroutinefunction(func)
+
+    async def call(self, item):
+        if self._is_async:
+            return await self.func(item)
+        return await asyncio.to_thread(self.func, item)
+
+
+class Pipeline:
+    """
+    stage 별로 bounded queue와 worker pool을 가지는 pipeline
+    item은 stage 순서대로 처리되며, 각 stage는 동시에 서로 다른 item을 처리함 (N+1번째 export 중 N번째 이미지 업로드)
+    queue 크기로 동시에 처리중인 item 수가 제한되므로 메모리, 디스크 사용량이 제한됨 (backpressure)
+    """
+
+    def __init__(self, stages: List[Stage], on_error: Optional[Callable[[Any, Exception, Stage], None]] = None):
+        """
+        Args:
+            stages: 처리 순서대로 나열된 stage
+            on_error: stage에서 예외 발생시 호출 (item은 이후 stage로 넘어가지 않음)
+        """
+        self.stages = stages
+        self.on_error = on_error
+
+    async def run(self, items: Union[Iterable, AsyncIterable]) -> List[Any]:
+        """
+        items를 모든 stage에 통과시키고 마지막 stage까지 성공한 결과를 반환
+        """
+        results = []
+
+        for stage in self.stages:
+            stage.queue = asyncio.Queue(maxsize=stage.queue_size)
+            stage._alive_workers = stage.workers
+
+        workers = []
+        for idx, stage in enumerate(self.stages):
+            next_stage = self.stages[idx + 1] if idx + 1 < len(self.stages) else None
+            for i in range(stage.workers):
+                workers.append(asyncio.create_task(self._work(stage, next_stage, results),
+                                                   name=f'{stage.name}-{i}'))
+
+        async def feed():
+            # 첫번째 stage에 item 공급 (queue가 가득 차면 대기)
+            first_stage = self.stages[0]
+            if isinstance(items, AsyncIterable):
+                async for item in items:
+                    await first_stage.queue.put(item)
+            else:
+                for item in items:
+                    await first_stage.queue.put(item)
+            for _ in range(first_stage.workers):
+                await first_stage.queue.put(_STOP)
+
+        # worker가 예외로 종료되면 gather가 바로 실패하므로 공급이 가득 찬 queue에서 멈춰있지 않음
+        feeder = asyncio.create_task(feed(), name='feeder')
+        try:
+            await asyncio.gather(feeder, *workers)
+        finally:
+            for task in [feeder] + workers:
+                task.cancel()
+
+        return results
+
+    async def _work(self, stage: Stage, next_stage: Optional[Stage], results: list):
+        cancelled = False
+        try:
+            await self._consume(stage, next_stage, results)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            # 마지막으로 종료되는 worker가 다음 stage에 종료 신호 전달 (예외로 종료된 경우 포함, 취소된 경우 제외)
+            stage._alive_workers -= 1
+            if not cancelled and stage._alive_workers == 0 and next_stage is not None:
+                for _ in range(next_stage.workers):
+                    await next_stage.queue.put(_STOP)
+
+    async def _consume(self, stage: Stage, next_stage: Optional[Stage], results: list):
+        while True:
+            item = await stage.queue.get()
+            if item is _STOP:
+                break
+
+            start = time.monotonic()
+            try:
+                output = await stage.call(item)
+                failed = False
+            except Exception as e:
+                failed = True
+                self._handle_error(item, e, stage)
+            end = time.monotonic()
+
+            stats = stage.stats
+            stats.busy_time += end - start
+            stats.first_start = start if stats.first_start is None else min(stats.first_start, start)
+            stats.last_end = end if stats.last_end is None else max(stats.last_end, end)
+            if failed:
+                stats.failed += 1
+                continue
+            stats.processed += 1
+
+            if next_stage is None:
+                results.append(output)
+            else:
+                await next_stage.queue.put(output)
+
+    def _handle_error(self, item, error: Exception, stage: Stage) -> None:
+        # on_error에서 예외가 발생해도 worker는 다음 item을 계속 처리
+        try:
+            if self.on_error is not None:
+                self.on_error(item, error, stage)
+            else:
+                logger.error(f'[{stage.name}] {error}')
+        except Exception as e:
+            logger.error(f'[{stage.name}] on_error failed: {e} (original error: {error})')
+
+    def report(self) -> str:
+        return '\n'.join(str(stage.stats) for stage in self.stages)
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+# 서비스별 기본 요청 속도 (초당 요청 수, 한번에 몰아서 보낼 수 있는 요청 수)
+SERVICE_LIMITS: Dict[str, Tuple[float, int]] = {
+    'notion': (3, 3),  # notion api (평균 초당 3회)
+    'notion_export': (3, 3),  # notion 내부 api (export task 등록, 상태 확인)
+    'imgur': (2, 4),
+    'github': (2, 10),
+}
+
+
+class TokenBucket:
+    """
+    token bucket 방식의 rate limiter
+    초당 rate개의 token이 채워지고 최대 burst개까지 쌓임 (요청 한번에 token 한개 사용)
+    여러 thread, coroutine에서 공유하여 사용할 수 있음
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Args:
+            rate: 초당 허용 요청 수
+            burst: 한번에 몰아서 보낼 수 있는 최대 요청 수
+        """
+        if rate <= 0:
+            raise ValueError(f'[Error] rate는 0보다 커야 합니다. [{rate}]')
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """token 한개를 예약하고, 사용 가능할 때까지 기다려야 하는 시간(초)을 반환"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+
+            # 먼저 예약한 요청부터 순서대로 사용하도록 token이 음수가 될 수 있음
+            self._tokens -= 1
+            wait = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        """서버가 요청한 시간(Retry-After 등) 동안 모든 요청을 멈춤"""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def acquire_blocking(self) -> None:
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def configure_rate_limit(service: str, rate: Optional[float] = None, burst: Optional[int] = None) -> TokenBucket:
+    """서비스의 요청 속도 설정 (값이 없으면 SERVICE_LIMITS의 기본값 사용)"""
+    default_rate, default_burst = SERVICE_LIMITS.get(service, (None, 1))
+    if rate is None:
+        rate = default_rate
+    if burst is None:
+        burst = default_burst
+    with _limiters_lock:
+        _limiters[service] = TokenBucket(rate, burst)
+        return _limiters[service]
+
+
+def get_rate_limiter(service: Optional[str]) -> Optional[TokenBucket]:
+    """
+    서비스의 모든 요청이 공유하는 limiter (동시에 실행되는 모든 요청이 서비스의 제한을 넘지 않도록 함)
+    SERVICE_LIMITS에 없는 서비스는 제한하지 않음 (None)
+    """
+    if service is None:
+        return None
+    with _limiters_lock:
+        limiter = _limiters.get(service)
+    if limiter is None and service in SERVICE_LIMITS:
+        limiter = configure_rate_limit(service)
+    return limiter
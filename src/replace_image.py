@@ -1,73 +1,210 @@
+import asyncio
+import io
+import mimetypes
 import os
-from pathlib import Path
+import posixpath
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
 from PIL import Image
-import time
-import requests
-import base64
+import aiohttp
 
+from src.export_archive import ExportArchive
+from src.http_client import get_http_client
+from src.image_cache import ImageCache, stream_hash
+from src.image_optimizer import VALID_IMAGE_FORMATS, ImageOptimizer, read_image_header
 from src.loggers import get_logger
+from src.markdown_engine import IMAGE, MarkdownEngine, Token, scan
 from src.utils import decode_url
 
 IMGUR_API_URL = 'https://api.imgur.com/3/image'
-VALID_IMAGE_FORMATS = {'JPEG', 'PNG', 'GIF', 'JPG'}
-UPLOAD_DELAY = 0.5
 
 logger = get_logger(logger_name='notion2md')
 
 
-def upload_image(image_path: str, client_id: str) -> str:
-    with open(image_path, 'rb') as f:
-        image_data = base64.b64encode(f.read())
-
-    response = requests.post(
-        IMGUR_API_URL,
-        headers={'Authorization': f'Client-ID {client_id}'},
-        data={'image': image_data}
-    )
+class CountingReader(io.RawIOBase):
+    """파일을 chunk 단위로 읽으면서 읽은 byte 수를 기록 (업로드한 크기 확인용)"""
+
+    def __init__(self, f: BinaryIO):
+        self._f = f
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._f.read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def fileno(self) -> int:
+        # 파일 크기를 알 수 있으면 Content-Length 사용 (알 수 없으면 chunked 전송)
+        return self._f.fileno()
+
+    def tell(self) -> int:
+        return self._f.tell()
+
+    def close(self) -> None:
+        self._f.close()
+        super().close()
+
+
+async def upload_image(image: Union[str, BinaryIO], client_id: str, filename: Optional[str] = None) -> str:
+    """
+    이미지를 multipart로 업로드 (파일을 chunk 단위로 읽어서 전송하므로 이미지 크기와 관계없이 메모리 사용량 일정)
+    Args:
+        image: 이미지 파일 경로 또는 파일 객체 (zip member 등)
+        client_id: imgur client id
+        filename: 업로드할 파일명 (없으면 파일 경로의 파일명)
+    """
+    if isinstance(image, str):
+        filename = filename or os.path.basename(image)
+        image = open(image, 'rb')
+    content_type = mimetypes.guess_type(filename or '')[0] or 'application/octet-stream'
+
+    with CountingReader(image) as reader:
+        def make_form() -> aiohttp.FormData:
+            # rate limit 등으로 재시도하는 경우 처음부터 다시 전송
+            if reader.bytes_read:
+                image.seek(0)
+                reader.bytes_read = 0
+            form = aiohttp.FormData()
+            form.add_field('type', 'file')
+            form.add_field('image', reader, filename=filename, content_type=content_type)
+            return form
+
+        response = await get_http_client().post(
+            IMGUR_API_URL,
+            service='imgur',
+            check_latency=False,  # 업로드 시간은 이미지 크기에 따라 다름
+            headers={'Authorization': f'Client-ID {client_id}'},
+            data=make_form
+        )
     response.raise_for_status()
 
     image_url = response.json()['data']['link']
-    logger.info(f'Uploaded image URL: {image_url}')
+    logger.info(f'Uploaded image URL: {image_url} ({reader.bytes_read} bytes sent)')
     return image_url
 
 
-def validate_image_format(image_path: str) -> str:
-    img = Image.open(image_path)
-    fmt = img.format
-
-    if fmt == 'WEBP':
-        new_path = Path(image_path).with_suffix('.png')
-        img.save(new_path, 'PNG')
-        return str(new_path)
-    elif fmt not in VALID_IMAGE_FORMATS:
-        raise ValueError(f'Invalid image format: {fmt}')
-
-    return image_path
-
-
-def process_image_line(line: str, data_dir: str, imgur_client_id: str) -> str:
-    start_idx = line.find('](') + 2
-    img_rel_path_md = line[start_idx:-1]
-    img_rel_path = decode_url(img_rel_path_md)
-
-    if img_rel_path.startswith('http'):
-        return line
-
-    img_path = os.path.join(data_dir, img_rel_path)
-    img_path = validate_image_format(img_path)
-    new_url = upload_image(img_path, imgur_client_id)
-    return line.replace(img_rel_path_md, new_url)
-
-
-def replace_image_urls_v2(markdown_text: str, data_dir: str, imgur_client_id: str) -> str:
-    if '![' not in markdown_text:
+def validate_image_format(image: BinaryIO) -> Optional[Tuple[str, bytes]]:
+    """
+    업로드 가능한 포맷인지 확인 (WEBP는 PNG로 변환하여 (확장자, 이미지) 반환, 그대로 업로드 가능하면 None)
+    """
+    with Image.open(image) as img:
+        fmt = img.format
+
+        if fmt == 'WEBP':
+            png = io.BytesIO()
+            img.save(png, 'PNG')
+            return 'png', png.getvalue()
+        elif fmt not in VALID_IMAGE_FORMATS:
+            raise ValueError(f'Invalid image format: {fmt}')
+
+    return None
+
+
+def _member_hash(archive: ExportArchive, member: str) -> str:
+    with archive.open(member) as f:
+        return stream_hash(f)
+
+
+def _validate_member(archive: ExportArchive, member: str) -> Optional[Tuple[str, bytes]]:
+    with archive.open(member) as f:
+        return validate_image_format(f)
+
+
+def _read_for_optimize(archive: ExportArchive, member: str, image_optimizer: ImageOptimizer) -> Optional[bytes]:
+    """header만 먼저 확인하고, 최적화할 이미지만 메모리로 읽음 (그대로 업로드할 이미지는 None)"""
+    with archive.open(member) as f:
+        fmt, _, is_animated = read_image_header(f)
+    if not image_optimizer.should_optimize(fmt, is_animated, archive.size(member)):
+        return None
+    return archive.read(member)
+
+
+async def resolve_image_url(archive: ExportArchive, member: str, imgur_client_id: str,
+                            image_cache: Optional[ImageCache] = None,
+                            page_urls: Optional[Dict[str, asyncio.Future]] = None,
+                            image_optimizer: Optional[ImageOptimizer] = None) -> str:
+    """
+    이미지 내용(hash)으로 업로드된 url을 먼저 찾고, 없는 경우에만 업로드
+    Args:
+        archive: export 결과 (압축 해제된 폴더 또는 zip)
+        member: archive 내의 이미지 경로
+        imgur_client_id: imgur client id
+        image_cache: 이전 실행에서 업로드한 이미지 url (hash -> url)
+        page_urls: 같은 페이지에서 업로드중인 이미지 (hash -> url future, 같은 이미지가 여러번 나오는 경우)
+        image_optimizer: 업로드 전 이미지 최적화 (없으면 포맷만 확인)
+    """
+    if page_urls is None:
+        page_urls = {}
+
+    digest = await asyncio.to_thread(_member_hash, archive, member)
+    if digest not in page_urls:
+        page_urls[digest] = asyncio.ensure_future(
+            _upload_once(digest, archive, member, imgur_client_id, image_cache, image_optimizer))
+    return await page_urls[digest]
+
+
+async def _upload_once(digest: str, archive: ExportArchive, member: str, imgur_client_id: str,
+                       image_cache: Optional[ImageCache],
+                       image_optimizer: Optional[ImageOptimizer]) -> str:
+    new_url = image_cache.get(digest) if image_cache is not None else None
+    if new_url is not None:
+        logger.info(f'Cached image URL: {new_url} ({member})')
+        return new_url
+
+    # 최적화, 포맷 변환된 이미지는 메모리에서 바로 업로드 (파일로 저장하지 않음)
+    # 애니메이션 GIF, 너무 큰 이미지 등 최적화하지 않는 이미지는 archive에서 바로 업로드
+    if image_optimizer is not None:
+        data = await asyncio.to_thread(_read_for_optimize, archive, member, image_optimizer)
+        converted = await image_optimizer.optimize(data, member) if data is not None else None
+    else:
+        converted = await asyncio.to_thread(_validate_member, archive, member)
+
+    filename = posixpath.basename(member)
+    if converted is None:
+        with archive.open(member) as f:
+            new_url = await upload_image(f, imgur_client_id, filename=filename)
+    else:
+        ext, data = converted
+        new_url = await upload_image(io.BytesIO(data), imgur_client_id,
+                                     filename=f'{posixpath.splitext(filename)[0]}.{ext}')
+
+    if image_cache is not None:
+        image_cache.set(digest, new_url)
+    return new_url
+
+
+async def replace_image_urls_v2(markdown_text: str, archive: ExportArchive, imgur_client_id: str,
+                                image_cache: Optional[ImageCache] = None,
+                                image_optimizer: Optional[ImageOptimizer] = None,
+                                image_paths: Optional[List[str]] = None) -> str:
+    """
+    markdown의 로컬 이미지(archive에서 읽음)를 업로드하고 url로 변경
+    모든 이미지를 동시에 업로드하며 (요청 속도는 'imgur' rate limiter로 제한), 완료 후 IMAGE token의 경로만 치환
+    (코드 블록 등 이미지 줄이 아닌 곳에 같은 경로가 있어도 변경하지 않음)
+    Args:
+        image_paths: markdown에 쓰인 로컬 이미지 경로 (변환할 때 확인한 MDInfo.images, 없으면 markdown에서 찾음)
+    """
+    if image_paths is None:
+        image_paths = scan(markdown_text).images
+    if not image_paths:
         return markdown_text
 
-    output_lines = []
-    for line in markdown_text.split('\n'):
-        if line.strip().startswith('!['):
-            line = process_image_line(line, data_dir, imgur_client_id)
-            time.sleep(UPLOAD_DELAY)
-        output_lines.append(line)
-
-    return '\n'.join(output_lines)
+    image_paths = list(dict.fromkeys(image_paths))  # 같은 이미지는 한번만 업로드
+    page_urls = {}  # 경로가 달라도 내용이 같은 이미지는 한번만 업로드
+    new_urls = await asyncio.gather(*(resolve_image_url(archive, archive.resolve(decode_url(img_rel_path_md)),
+                                                        imgur_client_id, image_cache, page_urls, image_optimizer)
+                                      for img_rel_path_md in image_paths))
+    url_map = dict(zip(image_paths, new_urls))
+
+    def rewrite_image_url(token: Token) -> None:
+        # ![name](경로) -> ![name](url) (경로는 parse_image_line과 같이 첫 '](' 다음부터)
+        url = url_map.get(token.info)
+        if url is not None:
+            start = token.text.find('](') + 2
+            token.text = f'{token.text[:start]}{url}{token.text[start + len(token.info):]}'
+
+    engine = MarkdownEngine()
+    engine.register(IMAGE, rewrite_image_url)
+    return engine.render(markdown_text)[0]
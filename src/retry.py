@@ -0,0 +1,58 @@
+import email.utils
+import random
+import time
+from typing import Mapping, Optional
+
+from src.loggers import get_logger
+
+logger = get_logger(logger_name='notion2md')
+
+DEFAULT_MAX_RETRIES = 4  # 재시도 횟수
+BACKOFF_BASE = 1  # 첫 재시도 대기 시간(초), 재시도마다 2배
+BACKOFF_MAX = 30  # 최대 재시도 대기 시간(초)
+MAX_RETRY_WAIT = 120  # 서버가 이보다 오래 기다리라고 하면 재시도하지 않음(초)
+
+RETRY_STATUSES = {500, 502, 503, 504}  # 멱등한 요청만 재시도
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+
+def backoff_delay(attempt: int) -> float:
+    """exponential backoff + jitter (attempt는 0부터 시작)"""
+    return min(BACKOFF_BASE * 2 ** attempt, BACKOFF_MAX) * random.uniform(0.5, 1.0)
+
+
+def retry_after_delay(headers: Mapping[str, str]) -> Optional[float]:
+    """
+    서버가 알려준 다음 요청까지 기다려야 하는 시간(초)
+        - Retry-After: 초 또는 HTTP 날짜
+        - X-RateLimit-Remaining이 0인 경우 X-RateLimit-Reset(epoch 초)까지 (GitHub)
+    """
+    retry_after = headers.get('Retry-After')
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                retry_at = email.utils.parsedate_to_datetime(retry_after)
+            except (TypeError, ValueError):
+                return None
+            return max(0.0, retry_at.timestamp() - time.time())
+
+    if headers.get('X-RateLimit-Remaining') == '0' and headers.get('X-RateLimit-Reset'):
+        try:
+            return max(0.0, float(headers['X-RateLimit-Reset']) - time.time())
+        except ValueError:
+            return None
+    return None
+
+
+def is_rate_limited(status: int, headers: Mapping[str, str]) -> bool:
+    """429, 또는 GitHub의 rate limit 초과 응답 (403 + Retry-After 또는 남은 요청 수 0)"""
+    if status == 429:
+        return True
+    return status == 403 and (bool(headers.get('Retry-After')) or headers.get('X-RateLimit-Remaining') == '0')
+
+
+def should_retry(status: int, headers: Mapping[str, str], idempotent: bool) -> bool:
+    # rate limit 응답은 요청이 처리되지 않은 것이므로 멱등하지 않은 요청도 재시도
+    return is_rate_limited(status, headers) or (idempotent and status in RETRY_STATUSES)
@@ -0,0 +1,96 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+from typing import Dict, Optional
+
+from pydantic import BaseModel
+
+from src.loggers import get_logger
+from src.models import PageInfo
+from src.utils import expanduser
+
+logger = get_logger(logger_name='notion2md')
+
+# front matter의 date는 변환할 때마다 현재 시각이 들어가므로 hash 계산에서 제외
+DATE_LINE_PATTERN = re.compile(r'^date: .*$', re.MULTILINE)
+
+
+class SyncRecord(BaseModel):
+    page_id: str
+    uid: Optional[int] = None
+    content_hash: Optional[str] = None  # 발행한 markdown의 hash
+    published_path: Optional[str] = None  # 발행한 markdown 파일명 (YYYY-MM-DD-UID.md)
+    published_date: Optional[str] = None  # 발행한 front matter의 date (다시 발행할 때 같은 시각 사용)
+
+
+def content_hash(content: str) -> str:
+    """발행할 markdown의 hash (front matter의 date 제외)"""
+    content = DATE_LINE_PATTERN.sub('', content, count=1)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+class SyncState:
+    """
+    page별 마지막 발행 정보를 저장하는 파일 (notion page id, uid 기준)
+        - 변환된 markdown이 같으면 github commit 생략
+        - 발행 요청으로 상태를 바꾸면 notion page의 last_edited_time도 바뀌므로 export는 생략하지 않음
+    update는 메모리에만 반영하고, 파일은 flush에서 실행 마지막에 한번 저장
+    """
+
+    def __init__(self, path: str):
+        self.path = expanduser(path)
+        self.records: Dict[str, SyncRecord] = {}
+        self.dirty = False  # 저장하지 않은 변경 여부
+        self._save_lock = asyncio.Lock()
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.records = {page_id: SyncRecord(**record) for page_id, record in data.items()}
+            except Exception as e:
+                logger.warning(f'Failed to read sync state, starting from empty state: {self.path} ({e})')
+
+    def get(self, page: PageInfo) -> Optional[SyncRecord]:
+        record = self.records.get(page.id)
+        if record is None or record.uid != page.uid:
+            return None
+        return record
+
+    def is_published(self, page: PageInfo, filename: str, content: str) -> bool:
+        """같은 내용의 markdown이 이미 발행되었는지 여부"""
+        record = self.get(page)
+        return (record is not None
+                and record.published_path == filename
+                and record.content_hash == content_hash(content))
+
+    def update(self, page: PageInfo, **fields) -> None:
+        record = self.get(page) or SyncRecord(page_id=page.id, uid=page.uid)
+        for key, value in fields.items():
+            setattr(record, key, value)
+        self.records[page.id] = record
+        self.dirty = True
+
+    async def flush(self) -> None:
+        """변경된 내용이 있으면 thread에서 저장 (실패해도 다음 flush에서 다시 저장)"""
+        async with self._save_lock:
+            if not self.dirty:
+                return
+            self.dirty = False
+            data = {page_id: record.dict() for page_id, record in self.records.items()}
+            try:
+                await asyncio.to_thread(self._write, data)
+            except Exception as e:
+                self.dirty = True
+                logger.warning(f'Failed to save sync state: {self.path} ({e})')
+
+    def _write(self, data: Dict[str, dict]) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        # 저장 중 중단되어도 기존 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
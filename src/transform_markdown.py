@@ -1,15 +1,29 @@
-from src.dateformat import convert_date_format
-from src.callouts import transform_callout
+from typing import BinaryIO, Optional
+
+from src.front_matter import FrontMatterMapping, default_mapping
 from src.loggers import get_logger
+from src.markdown_engine import IMAGE, TEXT, Document, MarkdownEngine, Token
 from src.models import MDInfo, FrontMatter
 
 logger = get_logger(logger_name='notion2md')
 
+WATER_MARK = 'Uploaded by [N2C](https://github.com/jmjeon2/Notion2Chirpy)'
+
+
+def rewrite_https(token: Token) -> None:
+    # replace http to https (코드 블록은 변경하지 않음)
+    token.text = token.text.replace('http://', 'https://')
+
 
-def processing_markdown(input_md_fp: str) -> MDInfo:
+# callout <aside>는 engine이 chirpy prompt로 변환
+engine = MarkdownEngine()
+engine.register((TEXT, IMAGE), rewrite_https)
+
+
+def processing_markdown(input_md_fp: str, mapping: FrontMatterMapping = default_mapping) -> MDInfo:
     """
     notion의 markdown file을 chirpy에 맞게 변환하는 함수
-        1. Read markdown file
+        1. Read markdown file (컬럼 정보까지 읽은 뒤 본문을 이어서 읽음)
         2. Transform front matter (notion의 컬럼 정보를 front matter로 변환)
         3. Transform markdown content (notion의 markdown 내용 중 chirpy에 맞게 변환)
             - callout <aside>를 info prompt로 변경
@@ -19,93 +33,35 @@ def processing_markdown(input_md_fp: str) -> MDInfo:
 
     Args:
         input_md_fp: markdown file path
-        output_dir: output directory path
+        mapping: notion 컬럼 -> front matter 변환 규칙
     """
+    with open(input_md_fp, 'rb') as f:
+        return convert_markdown_file(f, mapping)
 
-    """ front matter processing """
-    front_matter, content = transform_front_matter(input_md_fp)
-    front_matter_md = front_matter.to_md()
 
-    """ content processing """
-    # transform callout
-    content = transform_callout(content)
+def convert_markdown_file(f: BinaryIO, mapping: FrontMatterMapping = default_mapping,
+                          published_date: Optional[str] = None) -> MDInfo:
+    """
+    markdown file 객체(binary)를 변환 (컬럼 정보는 header만 읽어서 처리하고, 본문은 이어서 한번만 읽음)
+    published_date: 이전에 발행한 post의 date (같은 날짜이면 발행 시각을 유지하여 변환 결과가 바뀌지 않음)
+    """
+    values = mapping.read_header(f)
+    content, doc = engine.render(f.read().decode('utf-8'))
+    return _build_post(mapping.build(values, doc, published_date), content, doc)
 
-    # replace http to https
-    content = content.replace('http://', 'https://')
 
-    # add watermark
-    water_mark = 'Uploaded by [N2C](https://github.com/jmjeon2/Notion2Chirpy)'
-    content = f'{content}\n\n{water_mark}'
+def _build_post(front_matter: FrontMatter, content: str, doc: Document) -> MDInfo:
+    front_matter_md = front_matter.to_md()
 
-    # add content below front matter
-    final_md = f'{front_matter_md}\n\n{content}'
+    # add content below front matter, add watermark
+    final_md = ''.join((front_matter_md, '\n\n', content, '\n\n', WATER_MARK))
 
     # set output file path
     date = front_matter.date.split(' ')[0]  # 2024-09-21 00:00:00 +0900 -> 2024-09-21
     post_uid = front_matter.uid
     output_filename = f'{date}-{post_uid}.md'
 
-    md = MDInfo(filename=output_filename, content=final_md)
-
-    return md
-
-
-def transform_front_matter(input_md_fp) -> (FrontMatter, str):
-    with open(input_md_fp, 'r') as f:
-        md = f.read()
-    # delete 1 row title
-    md = md.split('\n\n', 2)
-
-    # split front matter and content
-    page_name = md[0][2:]  # delete '# ' in title
-    front_matter = md[1]
-    content = md[2]
-
-    # parsing front matter (key: value)
-    front_matter = front_matter.split('\n')
-    front_matter = [x.split(': ', maxsplit=1) for x in front_matter]
-    front_matter = dict(front_matter)
-
-    # merge category
-    front_matter['categories'] = front_matter['category1'] + ', ' + front_matter['category2']
-
-    # processing front matter
-    essential_keys = ['title', 'date', 'categories', 'tags', 'uid']  # 'description'
-    fixed_matter = {}  # 'author': 'jmjeon', 'pin': 'false', 'math': 'false', 'mermaid': 'false'} # author 미지정시 _config.yaml 기본 값으로 사용함
-    all_keys = ['title', 'description', 'date', 'categories', 'tags', 'author', 'pin', 'math', 'mermaid', 'uid']
-
-    # remove unnecessary keys
-    keys = list(front_matter.keys())
-    for key in keys:
-        if key not in all_keys:
-            front_matter.pop(key)
-
-    # add fixed matter to front matter
-    for key in fixed_matter:
-        front_matter[key] = fixed_matter[key]
-
-    # validate essential keys
-    for key in essential_keys:
-        if key not in front_matter:
-            logger.error(f'Essential key not found: {key}')
-            raise KeyError(f'Essential key not found: {key}')
-
-    # add math, mermaid if exist
-    if '$' in content:
-        front_matter['math'] = 'true'
-    if 'mermaid' in content:
-        front_matter['mermaid'] = 'true'
-
-    # apply date format (2024년 9월 21일 오전 12:00 (GMT+9) -> 2024-09-21 00:00:00 +0900)
-    front_matter['date'] = convert_date_format(front_matter['date'])
-
-    # convert A, B, C -> [A, B, C]
-    front_matter['categories'] = front_matter['categories'].split(', ')
-    front_matter['tags'] = front_matter['tags'].split(', ')
-
-    front_matter_obj = FrontMatter(**front_matter)
-
-    return front_matter_obj, content
+    return MDInfo(filename=output_filename, content=final_md, images=doc.images, date=front_matter.date)
 
 
 if __name__ == '__main__':
@@ -1,22 +1,30 @@
+import asyncio
+import hashlib
+import json
 import os
-import requests
 import base64
+import posixpath
 
 from pathlib import Path
-from typing import Union, Optional
+from typing import Dict, Tuple, Union, Optional
 
+from src.http_client import HTTPError, get_http_client, run
 from src.loggers import get_logger
-from src.utils import get_config
+from src.utils import expanduser, get_config
 
 logger = get_logger(logger_name='notion2md')
 
+GITHUB_API_ROOT = 'https://api.github.com'
+GITHUB_POST_DIR = '_posts'  # GitHub 저장소 내 post 폴더
+MAX_REF_UPDATE_RETRIES = 3  # branch가 그 사이 변경된 경우 다시 commit할 횟수
 
-def upload_or_update_file_to_github(username: str,
-                                    repo_name: str,
-                                    branch_name: str,
-                                    token: str,
-                                    file_path: Union[str, Path],
-                                    commit_message: Optional[str] = None):
+
+async def upload_or_update_file_to_github(username: str,
+                                          repo_name: str,
+                                          branch_name: str,
+                                          token: str,
+                                          file_path: Union[str, Path],
+                                          commit_message: Optional[str] = None):
     # github 내의 파일 경로 지정
     md_base_path = os.path.basename(file_path)
     github_file_path = os.path.join('_posts', md_base_path)  # GitHub 저장소 내 업로드할 파일 경로
@@ -25,7 +33,7 @@ def upload_or_update_file_to_github(username: str,
     uid = md_base_path.replace('.md', '').split('-')[-1]
 
     # GitHub API 엔드포인트
-    url = f"https://api.github.com/repos/{username}/{repo_name}/contents/{github_file_path}"
+    url = f"{GITHUB_API_ROOT}/repos/{username}/{repo_name}/contents/{github_file_path}"
 
     # API 요청에 사용할 헤더
     headers = {
@@ -34,7 +42,8 @@ def upload_or_update_file_to_github(username: str,
     }
 
     # 파일의 존재 여부를 확인하기 위한 GET 요청
-    response = requests.get(url, headers=headers)
+    client = get_http_client()
+    response = await client.get(url, service='github', headers=headers)
 
     if response.status_code == 200:
         # 파일이 이미 존재하는 경우 SHA 값을 가져온다
@@ -55,7 +64,14 @@ def upload_or_update_file_to_github(username: str,
         return
 
     with open(file_path, "rb") as f:
-        content = base64.b64encode(f.read()).decode("utf-8")
+        raw_content = f.read()
+
+    # 내용이 같으면 commit 하지 않음 (github 파일 sha는 git blob sha)
+    if file_sha is not None and file_sha == git_blob_sha(raw_content):
+        logger.info(f"[github api] 변경 사항이 없어 업로드를 생략합니다: {github_file_path}")
+        return
+
+    content = base64.b64encode(raw_content).decode("utf-8")
 
     # 업로드 또는 수정할 데이터 설정
     data = {
@@ -69,7 +85,9 @@ def upload_or_update_file_to_github(username: str,
         data['sha'] = file_sha
 
     # PUT 요청을 통해 파일을 업로드 또는 수정
-    response = requests.put(url, json=data, headers=headers)
+    # 이미 반영된 요청을 다시 보내지 않도록 rate limit 응답인 경우에만 재시도
+    response = await client.put(url, service='github', idempotent=False, check_latency=False, json=data,
+                                headers=headers)
 
     # 결과 출력
     if response.status_code in [200, 201]:
@@ -78,16 +96,177 @@ def upload_or_update_file_to_github(username: str,
         logger.info(f"[github api] 파일 업로드 실패: {response.json()}")
 
 
+
+def git_blob_sha(content: bytes) -> str:
+    """git이 파일 내용으로 계산하는 blob sha (github api의 파일 sha와 같음)"""
+    return hashlib.sha1(b'blob %d\0' % len(content) + content).hexdigest()
+
+
+def _commit_message(paths) -> str:
+    # parse uid from file path (_posts/YYYY-MM-DD-UID.md)
+    uids = [posixpath.basename(path).replace('.md', '').split('-')[-1] for path in sorted(paths)]
+    if len(uids) == 1:
+        return f'add post: {uids[0]}'
+    return f'add posts: {", ".join(uids)}'
+
+
+class GitHubBatchPublisher:
+    """
+    한번의 실행에서 발행할 post를 모아서 하나의 commit으로 업로드 (Git Data API, GitHub Pages 빌드도 한번만 실행됨)
+        1. post별 blob 생성
+        2. branch head의 tree를 base로 새 tree, commit 생성
+        3. branch ref 업데이트 (그 사이 다른 commit이 push된 경우 새 head 기준으로 다시 commit)
+    """
+
+    def __init__(self, username: str, repo_name: str, branch_name: str, token: str,
+                 post_dir: str = GITHUB_POST_DIR, tree_cache: Optional['GitHubTreeCache'] = None):
+        """
+        Args:
+            tree_cache: 마지막으로 확인한 post 폴더의 파일 목록 (branch head가 같으면 목록 조회 생략)
+        """
+        self.repo_url = f'{GITHUB_API_ROOT}/repos/{username}/{repo_name}'
+        self.branch_name = branch_name
+        self.post_dir = post_dir
+        self.tree_cache = tree_cache
+        self.headers = {
+            "Authorization": f"token {token}",
+            "Accept": "application/vnd.github.v3+json"
+        }
+        self.posts: Dict[str, str] = {}  # github 내의 파일 경로 -> markdown
+
+    def add(self, filename: str, content: str) -> None:
+        self.posts[posixpath.join(self.post_dir, filename)] = content
+
+    async def _request(self, method: str, path: str, idempotent: Optional[bool] = None, **kwargs) -> dict:
+        response = await get_http_client().request(method, f'{self.repo_url}/{path}', service='github',
+                                                   idempotent=idempotent, headers=self.headers, **kwargs)
+        response.raise_for_status()
+        return response.json()
+
+    async def _create_blob(self, content: str) -> str:
+        # blob, tree, commit은 내용으로 sha가 정해지므로 다시 보내도 결과가 같음
+        # 업로드 시간은 post 크기에 따라 다르므로 응답 시간으로 과부하를 판단하지 않음
+        blob = await self._request('POST', 'git/blobs', idempotent=True, check_latency=False,
+                                   json={'content': content, 'encoding': 'utf-8'})
+        return blob['sha']
+
+    async def _get_head(self) -> Tuple[str, str]:
+        """branch head의 (commit sha, tree sha)"""
+        head_sha = (await self._request('GET', f'git/ref/heads/{self.branch_name}'))['object']['sha']
+        base_tree_sha = (await self._request('GET', f'git/commits/{head_sha}'))['tree']['sha']
+        return head_sha, base_tree_sha
+
+    async def _get_post_shas(self, head_sha: str, base_tree_sha: str) -> Dict[str, str]:
+        """head commit의 post 폴더 파일 목록 (github 내의 파일 경로 -> blob sha)"""
+        if self.tree_cache is not None and self.tree_cache.head_sha == head_sha:
+            return self.tree_cache.shas
+
+        shas = {}
+        tree_sha = base_tree_sha
+        for name in self.post_dir.split('/'):
+            entries = (await self._request('GET', f'git/trees/{tree_sha}'))['tree']
+            tree_sha = next((e['sha'] for e in entries if e['path'] == name and e['type'] == 'tree'), None)
+            if tree_sha is None:  # post 폴더가 없는 경우
+                break
+        else:
+            entries = (await self._request('GET', f'git/trees/{tree_sha}'))['tree']
+            shas = {posixpath.join(self.post_dir, e['path']): e['sha'] for e in entries if e['type'] == 'blob'}
+
+        if self.tree_cache is not None:
+            self.tree_cache.update(head_sha, shas)
+        return shas
+
+    async def flush(self, commit_message: Optional[str] = None) -> Optional[str]:
+        """
+        모아둔 post를 하나의 commit으로 업로드하고 commit sha 반환
+        (git blob sha를 직접 계산하여 branch의 파일과 내용이 같은 post는 제외, 업로드할 post가 없으면 None)
+        """
+        if not self.posts:
+            return None
+        posts, self.posts = self.posts, {}
+
+        head_sha, base_tree_sha = await self._get_head()
+        remote_shas = await self._get_post_shas(head_sha, base_tree_sha)
+        local_shas = {path: git_blob_sha(content.encode('utf-8')) for path, content in posts.items()}
+        unchanged = [path for path in posts if remote_shas.get(path) == local_shas[path]]
+        if unchanged:
+            logger.info(f'[github api] 변경 사항이 없는 파일은 업로드를 생략합니다: {", ".join(unchanged)}')
+        posts = {path: content for path, content in posts.items() if path not in unchanged}
+        if not posts:
+            return None
+
+        blob_shas = await asyncio.gather(*(self._create_blob(content) for content in posts.values()))
+        tree = [{'path': path, 'mode': '100644', 'type': 'blob', 'sha': sha} for path, sha in zip(posts, blob_shas)]
+        message = commit_message or _commit_message(posts)
+
+        for attempt in range(MAX_REF_UPDATE_RETRIES + 1):
+            if attempt > 0:
+                head_sha, base_tree_sha = await self._get_head()
+
+            new_tree = await self._request('POST', 'git/trees', idempotent=True, check_latency=False,
+                                           json={'base_tree': base_tree_sha, 'tree': tree})
+            commit = await self._request('POST', 'git/commits', idempotent=True,
+                                         json={'message': message, 'tree': new_tree['sha'], 'parents': [head_sha]})
+            try:
+                await self._request('PATCH', f'git/refs/heads/{self.branch_name}',
+                                    json={'sha': commit['sha'], 'force': False})
+            except HTTPError as e:
+                # fast-forward가 아닌 경우 (그 사이 다른 commit이 push됨)
+                if e.status == 422 and attempt < MAX_REF_UPDATE_RETRIES:
+                    logger.warning(f'[github api] {self.branch_name} branch가 변경되어 다시 commit합니다. '
+                                   f'({attempt + 1}/{MAX_REF_UPDATE_RETRIES})')
+                    continue
+                raise
+
+            # 새 commit의 파일 목록 저장 (다음 실행에서 목록 조회 생략)
+            if self.tree_cache is not None and attempt == 0:
+                self.tree_cache.update(commit['sha'], {**remote_shas, **dict(zip(posts, blob_shas))})
+            logger.info(f"[github api] {len(posts)}개 파일 commit 성공: {commit['sha']} ({message})")
+            return commit['sha']
+
+
+class GitHubTreeCache:
+    """
+    마지막으로 확인한 branch head와 post 폴더의 파일 목록 (github 내의 파일 경로 -> blob sha)
+    head가 바뀌지 않았으면 파일 목록을 다시 조회하지 않음
+    """
+
+    def __init__(self, path: str):
+        self.path = expanduser(path)
+        self.head_sha: Optional[str] = None
+        self.shas: Dict[str, str] = {}
+
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.head_sha, self.shas = data['head_sha'], data['shas']
+            except Exception as e:
+                logger.warning(f'Failed to read github tree cache, starting from empty cache: {self.path} ({e})')
+
+    def update(self, head_sha: str, shas: Dict[str, str]) -> None:
+        self.head_sha, self.shas = head_sha, shas
+        self.save()
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        # 저장 중 중단되어도 기존 파일이 깨지지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'head_sha': self.head_sha, 'shas': self.shas}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
 if __name__ == '__main__':
     config = get_config()
 
     file_path = '../test/samples/2024-09-26-234.md'  # 업로드할 로컬 파일 경로
 
-    upload_or_update_file_to_github(
+    run(upload_or_update_file_to_github(
         config.GITHUB.USERNAME,
         config.GITHUB.REPO_NAME,
         config.GITHUB.BRANCH,
         config.GITHUB.TOKEN,
         file_path,
         commit_message="test: upload file via api"
-    )
+    ))
@@ -0,0 +1,105 @@
+import asyncio
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+from src.loggers import get_logger
+from src.utils import expanduser
+
+logger = get_logger(logger_name='notion2md')
+
+
+class GitCommandError(Exception):
+    def __init__(self, args: Tuple[str, ...], returncode: int, output: str):
+        self.returncode = returncode
+        super().__init__(f'[Error] git {" ".join(args)} 실패 (exit code {returncode}): {output.strip()}')
+
+
+async def run_git(repo_dir: Union[str, Path], *args: str, check: bool = True) -> Tuple[int, str]:
+    """
+    repo_dir에서 git 명령 실행 후 (exit code, 출력) 반환
+    """
+    process = await asyncio.create_subprocess_exec('git', '-C', str(repo_dir), *args,
+                                                   stdout=asyncio.subprocess.PIPE,
+                                                   stderr=asyncio.subprocess.STDOUT)
+    output, _ = await process.communicate()
+    output = output.decode('utf-8', errors='replace')
+    if check and process.returncode != 0:
+        raise GitCommandError(args, process.returncode, output)
+    return process.returncode, output
+
+
+def write_file_atomic(file_path: Path, content: str) -> None:
+    # 쓰는 중 중단되어도 working tree에 반쯤 쓰인 post가 남지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = file_path.with_name(f'.{file_path.name}.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, file_path)
+
+
+def _commit_message(filenames) -> str:
+    # parse uid from file name (YYYY-MM-DD-UID.md)
+    uids = [filename.replace('.md', '').split('-')[-1] for filename in sorted(filenames)]
+    if len(uids) == 1:
+        return f'add post: {uids[0]}'
+    return f'add posts: {", ".join(uids)}'
+
+
+class LocalRepoPublisher:
+    """
+    로컬 저장소(LOCAL_REPO_POST_DIR)에 post를 저장하고 git CLI로 한번의 실행에 하나의 commit 생성 (push는 optional)
+    GitHub API 없이 동작하므로 임시 저장소로 테스트할 수 있음
+    """
+
+    def __init__(self, post_dir: Union[str, Path], push: bool = False,
+                 remote: Optional[str] = None, branch: Optional[str] = None):
+        """
+        Args:
+            post_dir: 로컬 저장소의 post 폴더 (ex. PATH/TO/YOUR/REPO/_posts)
+            push: commit 후 push 여부
+            remote: push할 remote (없으면 git 기본 설정 사용)
+            branch: push할 branch (없으면 git 기본 설정 사용)
+        """
+        self.post_dir = Path(expanduser(str(post_dir)))
+        self.push = push
+        self.remote = remote
+        self.branch = branch
+        self.posts: Dict[str, str] = {}  # 파일명 -> markdown
+
+    def add(self, filename: str, content: str) -> None:
+        self.posts[filename] = content
+
+    async def flush(self, commit_message: Optional[str] = None) -> Optional[str]:
+        """
+        모아둔 post를 저장하고 하나의 commit으로 기록한 뒤 commit sha 반환 (변경된 post가 없으면 None)
+        """
+        if not self.posts:
+            return None
+        posts, self.posts = self.posts, {}
+
+        if not self.post_dir.exists():
+            raise ValueError(f'[Error] Local repo post directory not found: {self.post_dir}')
+
+        for filename, content in posts.items():
+            await asyncio.to_thread(write_file_atomic, self.post_dir / filename, content)
+            logger.info(f'[local repo] 파일 저장: {self.post_dir / filename}')
+
+        # 저장한 post만 stage, commit (사용자가 stage한 다른 파일은 commit하지 않음)
+        paths = sorted(posts)
+        await run_git(self.post_dir, 'add', '--', *paths)
+        returncode, _ = await run_git(self.post_dir, 'diff', '--cached', '--quiet', '--', *paths, check=False)
+        if returncode == 0:
+            logger.info('[local repo] 변경 사항이 없어 commit을 생략합니다.')
+            return None
+
+        message = commit_message or _commit_message(posts)
+        await run_git(self.post_dir, 'commit', '-m', message, '--', *paths)
+        _, commit_sha = await run_git(self.post_dir, 'rev-parse', 'HEAD')
+        commit_sha = commit_sha.strip()
+        logger.info(f'[local repo] {len(posts)}개 파일 commit 성공: {commit_sha} ({message})')
+
+        if self.push:
+            push_args = [arg for arg in (self.remote, self.branch) if arg]
+            await run_git(self.post_dir, 'push', *push_args)
+            logger.info(f'[local repo] push 완료: {" ".join(push_args) or "default remote"}')
+        return commit_sha
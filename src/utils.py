@@ -36,6 +36,22 @@ def get_config():
     return config
 
 
+def get_option(config: EasyDict, key: str, default=None):
+    """
+    'A.B.C' 형태의 key로 config 값을 조회 (기존 config 파일에 없는 optional 값은 default 반환)
+    Args:
+        config (EasyDict): config
+        key (str): 조회할 key (ex. 'PIPELINE.WORKERS')
+        default: 값이 없는 경우 반환할 기본값
+    """
+    value = config
+    for k in key.split('.'):
+        if not isinstance(value, dict) or value.get(k) is None:
+            return default
+        value = value[k]
+    return value
+
+
 def expanduser(path):
     """경로에 ~가 붙으면 expanduser 처리"""
     if path.startswith('~'):
@@ -44,6 +60,26 @@ def expanduser(path):
         return path
 
 
+def make_workspace(download_dir: str, name: str) -> str:
+    """
+    download_dir 하위에 페이지별 작업 폴더를 생성 (동시에 여러 페이지를 처리하기 위해 페이지마다 폴더를 분리)
+    Args:
+        download_dir (str): 다운로드 폴더
+        name (str): 작업 폴더 이름 (ex. notion page id)
+    """
+    workspace = expanduser(os.path.join(download_dir, name))
+    os.makedirs(workspace, exist_ok=True)
+
+    # 이전 실행에서 남은 파일이 있는 경우
+    exist_file_list = os.listdir(workspace)
+    if '.DS_Store' in exist_file_list:
+        exist_file_list.remove('.DS_Store')
+    if len(exist_file_list) > 0:
+        raise ValueError(f'[Error] Files already exist in {workspace}. Please remove them before exporting')
+
+    return workspace
+
+
 def unzip_all(directory: str, remove_zip=False):
     """
     download_dir 폴더 내에 있는 모든 zip 파일 중 Export로 시작하는 파일들을 압축 해제
@@ -103,8 +139,11 @@ def delete_file(filepath):
     if not os.path.exists(filepath):
         raise ValueError(f'[Error] 삭제할 파일이 존재하지 않습니다. [{filepath}]')
 
+    # 페이지별 작업 폴더(workspace)인 경우
+    if os.path.isdir(filepath):
+        rmtree(filepath)
     # Export~/~.html 이미지를 포함한 폴더인 경우
-    if 'Export' in filepath:
+    elif 'Export' in filepath:
         dir_path = os.path.dirname(filepath)
         rmtree(dir_path)
     # ~.html 단일 파일인 경우